@@ -0,0 +1,26 @@
+"""Add video encoding profile and preview path
+
+Revision ID: b7e2c91d4f3a
+Revises: 0937ce8d5a1c
+Create Date: 2025-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c91d4f3a'
+down_revision = '0937ce8d5a1c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('encoding_profile', sa.String(length=30), nullable=True))
+    op.add_column('videos', sa.Column('preview_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'preview_path')
+    op.drop_column('videos', 'encoding_profile')
@@ -0,0 +1,43 @@
+"""Add video stage timings
+
+Revision ID: d4a1f0c83e6b
+Revises: b7e2c91d4f3a
+Create Date: 2025-10-27 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a1f0c83e6b'
+down_revision = 'b7e2c91d4f3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('video_stage_timings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.String(length=50), nullable=True),
+    sa.Column('stage', sa.String(length=30), nullable=False),
+    sa.Column('duration', sa.Float(), nullable=False),
+    sa.Column('encoding_profile', sa.String(length=30), nullable=True),
+    sa.Column('status', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_video_stage_timings_created_at'), 'video_stage_timings', ['created_at'], unique=False)
+    op.create_index(op.f('ix_video_stage_timings_id'), 'video_stage_timings', ['id'], unique=False)
+    op.create_index(op.f('ix_video_stage_timings_stage'), 'video_stage_timings', ['stage'], unique=False)
+    op.create_index(op.f('ix_video_stage_timings_video_id'), 'video_stage_timings', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_video_stage_timings_video_id'), table_name='video_stage_timings')
+    op.drop_index(op.f('ix_video_stage_timings_stage'), table_name='video_stage_timings')
+    op.drop_index(op.f('ix_video_stage_timings_id'), table_name='video_stage_timings')
+    op.drop_index(op.f('ix_video_stage_timings_created_at'), table_name='video_stage_timings')
+    op.drop_table('video_stage_timings')
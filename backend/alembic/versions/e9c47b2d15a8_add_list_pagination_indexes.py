@@ -0,0 +1,31 @@
+"""Add keyset pagination indexes for scripts and videos
+
+Revision ID: e9c47b2d15a8
+Revises: d4a1f0c83e6b
+Create Date: 2025-11-03 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9c47b2d15a8'
+down_revision = 'd4a1f0c83e6b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (created_at, id) matches ORDER BY created_at DESC, id DESC and the cursor row comparison
+    op.create_index('ix_scripts_created_at_id', 'scripts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_scripts_status_created_at_id', 'scripts', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_videos_created_at_id', 'videos', ['created_at', 'id'], unique=False)
+    op.create_index('ix_videos_status_created_at_id', 'videos', ['status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_videos_status_created_at_id', table_name='videos')
+    op.drop_index('ix_videos_created_at_id', table_name='videos')
+    op.drop_index('ix_scripts_status_created_at_id', table_name='scripts')
+    op.drop_index('ix_scripts_created_at_id', table_name='scripts')
@@ -0,0 +1,51 @@
+"""Add indexes for automation hot queries
+
+Revision ID: f2b8d6e4a9c1
+Revises: e9c47b2d15a8
+Create Date: 2025-11-05 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d6e4a9c1'
+down_revision = 'e9c47b2d15a8'
+branch_labels = None
+depends_on = None
+
+
+# (table, name, columns)
+INDEXES = [
+    ('scheduled_posts', 'ix_scheduled_posts_status_scheduled_time', ['status', 'scheduled_time']),
+    ('scheduled_posts', 'ix_scheduled_posts_status_published_at', ['status', 'published_at']),
+    ('automation_logs', 'ix_automation_logs_level_created_at', ['level', 'created_at']),
+    ('automation_logs', 'ix_automation_logs_created_at', ['created_at']),
+]
+
+
+def _existing():
+    """Automation tables are created by the app (create_all), so they may be missing here"""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    return {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in ('scheduled_posts', 'automation_logs')
+        if table in tables
+    }
+
+
+def upgrade() -> None:
+    existing = _existing()
+    for table, name, columns in INDEXES:
+        if table not in existing or name in existing[table]:
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    existing = _existing()
+    for table, name, _ in reversed(INDEXES):
+        if name in existing.get(table, ()):
+            op.drop_index(name, table_name=table)
@@ -21,6 +21,10 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # WebSocket progress
+    WS_HEARTBEAT_INTERVAL: float = float(os.getenv("WS_HEARTBEAT_INTERVAL", "15"))  # seconds
+    WS_QUEUE_SIZE: int = int(os.getenv("WS_QUEUE_SIZE", "100"))  # per-client buffered updates
+    
     # JWT Authentication
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "change-this-secret-key-in-production")
     JWT_ALGORITHM: str = "HS256"
@@ -32,6 +36,11 @@ class Settings(BaseSettings):
     HEYGEN_TEMPLATE_ID: Optional[str] = os.getenv("HEYGEN_TEMPLATE_ID")
     HEYGEN_AVATAR_ID: Optional[str] = os.getenv("HEYGEN_AVATAR_ID")
     OPENROUTER_API_KEY: Optional[str] = os.getenv("OPENROUTER_API_KEY")
+    # LLM response cache (Redis, SQLite fallback)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+    LLM_CACHE_SQLITE_PATH: Optional[str] = os.getenv("LLM_CACHE_SQLITE_PATH")  # default STORAGE_PATH/cache/llm_cache.sqlite3
+    GROQ_CONCURRENCY: int = int(os.getenv("GROQ_CONCURRENCY", "5"))  # parallel script completions
     
     # Telegram
     TELEGRAM_BOT_TOKEN: Optional[str] = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -45,9 +54,51 @@ class Settings(BaseSettings):
     YOUTUBE_TOKEN: Optional[str] = os.getenv("YOUTUBE_TOKEN")
     TIKTOK_TOKEN: Optional[str] = os.getenv("TIKTOK_TOKEN")
     
+    # Publishing fan-out: threads, chord or sequential
+    PUBLISH_FANOUT: str = os.getenv("PUBLISH_FANOUT", "threads")
+    PUBLISH_MAX_THREADS: int = int(os.getenv("PUBLISH_MAX_THREADS", "4"))
+    
+    # Automation pipeline
+    PIPELINE_LEAD_MINUTES: int = int(os.getenv("PIPELINE_LEAD_MINUTES", "20"))  # start generation this long before the slot
+    AUTOMATION_VOICE_ID: str = os.getenv("AUTOMATION_VOICE_ID", "pNInz6obpgDQGcFmaJgB")  # Adam (ElevenLabs)
+    BACKGROUND_PREFETCH_PER_THEME: int = int(os.getenv("BACKGROUND_PREFETCH_PER_THEME", "3"))  # ready backgrounds kept per theme
+    
     # Storage (use temp dir for local dev, /storage for production)
     STORAGE_PATH: str = os.getenv("STORAGE_PATH", os.path.join(os.path.expanduser("~"), ".allaboutme", "storage"))
     
+    # Video rendering
+    VIDEO_RENDERER: str = os.getenv("VIDEO_RENDERER", "native")  # native (NumPy + ffmpeg pipe) or moviepy
+    SUBTITLE_FONT: Optional[str] = os.getenv("SUBTITLE_FONT")  # path to .ttf, must cover Cyrillic
+    TEXT_CARD_CACHE_MB: int = int(os.getenv("TEXT_CARD_CACHE_MB", "128"))  # rendered subtitle cards kept per renderer process
+    
+    # Warm render process pool (used when the render worker runs --pool=threads)
+    RENDER_POOL: bool = os.getenv("RENDER_POOL", "true").lower() == "true"
+    RENDER_POOL_SIZE: int = int(os.getenv("RENDER_POOL_SIZE", "2"))  # 0 = CPU cores (host cores inside containers)
+    BACKGROUND_CACHE_MAX_MB: int = int(os.getenv("BACKGROUND_CACHE_MAX_MB", "1024"))  # normalized .npy frames (STORAGE_PATH/cache/backgrounds)
+    
+    # Per-job scratch workspaces (TEMP_DIR/jobs)
+    WORKSPACE_QUOTA_MB: int = int(os.getenv("WORKSPACE_QUOTA_MB", "4096"))  # all concurrent jobs on this node
+    WORKSPACE_RESERVE_MB: int = int(os.getenv("WORKSPACE_RESERVE_MB", "300"))  # reserved per render job
+    WORKSPACE_QUOTA_WAIT: float = float(os.getenv("WORKSPACE_QUOTA_WAIT", "300"))  # seconds to wait for space
+    WORKSPACE_MAX_AGE: float = float(os.getenv("WORKSPACE_MAX_AGE", "7200"))  # stale age for other hosts' jobs
+    
+    # Prometheus metrics (multiprocess registry shared by API, workers and renderers on one host)
+    PROMETHEUS_MULTIPROC_DIR: str = os.getenv("PROMETHEUS_MULTIPROC_DIR", "/tmp/allaboutme_prometheus")
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "0"))  # serve /metrics from a worker host, 0 = off
+    
+    # Keep-alive connections per pooled HTTP session
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    
+    # TTS audio cache (STORAGE_PATH/audio/tts_cache)
+    TTS_CACHE_MAX_MB: int = int(os.getenv("TTS_CACHE_MAX_MB", "2048"))
+    TTS_TIMESTAMPS: bool = os.getenv("TTS_TIMESTAMPS", "true").lower() == "true"  # subtitle timing from ElevenLabs alignment
+    
+    # Provider rate limits / circuit breaker (shared across workers via Redis)
+    RATE_LIMITS: str = os.getenv("RATE_LIMITS", "")  # overrides, e.g. "groq=0.5/5,telegram=1/3" (req/sec / burst)
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "120"))  # seconds a call may queue for a token
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures to open
+    BREAKER_COOLDOWN: float = float(os.getenv("BREAKER_COOLDOWN", "60"))  # seconds before a half-open probe
+    
     # CORS
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -1,16 +1,18 @@
 """FastAPI main application"""
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-import redis
+import asyncio
 import json
 import logging
+import time
 from pathlib import Path
 
 from .config import settings
 from .routers import auth, scripts, videos
 from .database import engine, Base
+from .services import telemetry
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -55,8 +58,21 @@ app.include_router(tasks_router.router)
 from .routers import automation
 app.include_router(automation.router)
 
-# Redis client for WebSocket
-redis_client = redis.from_url(settings.REDIS_URL)
+# Shared async progress fan-out for WebSockets
+from .services.progress_hub import progress_hub, is_terminal
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency histogram per router (see services/telemetry.py)"""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        telemetry.observe_request(request.url.path, request.method, status_code, time.perf_counter() - started)
 
 
 @app.get("/health")
@@ -65,45 +81,42 @@ def health_check():
     return {"status": "ok", "app": settings.APP_NAME}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus scrape endpoint: API, Celery workers and renderers of this host"""
+    data, content_type = telemetry.render_latest()
+    return Response(content=data, media_type=content_type)
+
+
 @app.websocket("/ws/progress/{task_id}")
 async def websocket_progress(websocket: WebSocket, task_id: str):
     """WebSocket endpoint for real-time progress updates"""
     await websocket.accept()
     
+    queue = await progress_hub.subscribe(task_id)
+    logger.info(f"WebSocket connected for task: {task_id}")
+    
     try:
-        # Subscribe to Redis pub/sub for this task
-        pubsub = redis_client.pubsub()
-        pubsub.subscribe(f"progress:{task_id}")
-        
-        logger.info(f"WebSocket connected for task: {task_id}")
-        
-        # Listen for messages
-        for message in pubsub.listen():
-            if message['type'] == 'message':
-                data = message['data']
-                if isinstance(data, bytes):
-                    data = data.decode('utf-8')
-                
-                await websocket.send_text(data)
-                
-                # Check if task is completed
-                try:
-                    msg_data = json.loads(data)
-                    if msg_data.get('status') in ['completed', 'failed']:
-                        break
-                except:
-                    pass
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=settings.WS_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # Heartbeat keeps proxies from dropping idle sockets and detects dead clients
+                await websocket.send_text(json.dumps({"type": "ping", "task_id": task_id}))
+                continue
+            
+            await websocket.send_text(data)
+            
+            # Check if task is completed
+            if is_terminal(data):
+                break
     
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for task: {task_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        try:
-            pubsub.unsubscribe(f"progress:{task_id}")
-            pubsub.close()
-        except:
-            pass
+        progress_hub.unsubscribe(task_id, queue)
 
 
 # Generator endpoints
@@ -118,6 +131,14 @@ app.include_router(publisher_router.router)
 from .routers import settings as settings_router
 app.include_router(settings_router.router)
 
+# Provider rate limit / circuit breaker endpoints
+from .routers import providers as providers_router
+app.include_router(providers_router.router)
+
+# Render stage metrics
+from .routers import metrics as metrics_router
+app.include_router(metrics_router.router)
+
 
 # Mount storage directory for videos/audio
 from . import storage as storage_module
@@ -176,6 +197,9 @@ async def startup_event():
     """Initialize app on startup"""
     logger.info(f"Starting {settings.APP_NAME}")
     
+    # Start shared Redis subscriber for progress WebSockets
+    await progress_hub.start()
+    
     # Initialize storage
     from .storage import init_storage
     init_storage()
@@ -235,4 +259,5 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down...")
+    await progress_hub.stop()
 
@@ -1,5 +1,5 @@
 """SQLAlchemy database models"""
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -31,6 +31,12 @@ class Script(Base):
     
     # Relationships
     videos = relationship("Video", back_populates="script", cascade="all, delete-orphan")
+    
+    # Keyset pagination of list views (newest first, optionally by status)
+    __table_args__ = (
+        Index("ix_scripts_created_at_id", "created_at", "id"),
+        Index("ix_scripts_status_created_at_id", "status", "created_at", "id"),
+    )
 
 
 class Video(Base):
@@ -45,11 +51,37 @@ class Video(Base):
     generator = Column(String(20))  # heygen, opensource
     duration = Column(Integer)
     error_message = Column(Text)
+    encoding_profile = Column(String(30))  # profile of video_path: preview, publish, publish_youtube, ...
+    preview_path = Column(String(500))  # fast low-res encode for moderation
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     script = relationship("Script", back_populates="videos")
     publications = relationship("Publication", back_populates="video", cascade="all, delete-orphan")
+    stage_timings = relationship("VideoStageTiming", back_populates="video", cascade="all, delete-orphan")
+    
+    # Keyset pagination of list views (newest first, optionally by status)
+    __table_args__ = (
+        Index("ix_videos_created_at_id", "created_at", "id"),
+        Index("ix_videos_status_created_at_id", "status", "created_at", "id"),
+    )
+
+
+class VideoStageTiming(Base):
+    """Duration of one render pipeline stage (background, tts, encode, ...)"""
+    __tablename__ = "video_stage_timings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False, index=True)
+    task_id = Column(String(50))
+    stage = Column(String(30), nullable=False, index=True)
+    duration = Column(Float, nullable=False)  # seconds
+    encoding_profile = Column(String(30))
+    status = Column(String(10), default="ok")  # ok, error
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    # Relationships
+    video = relationship("Video", back_populates="stage_timings")
 
 
 class Publication(Base):
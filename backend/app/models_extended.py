@@ -1,5 +1,5 @@
 """Extended models for automation"""
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Time
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Time, Index
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -14,7 +14,7 @@ class ScheduledPost(Base):
     
     # Scheduling
     scheduled_time = Column(DateTime(timezone=True), nullable=False)
-    status = Column(String(20), default="pending")  # pending, generated, published, failed
+    status = Column(String(20), default="pending")  # pending, queued, generating_*, generated, publishing, published, failed
     
     # Platform targets
     publish_to_telegram = Column(Boolean, default=True)
@@ -30,6 +30,13 @@ class ScheduledPost(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     published_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
+    
+    __table_args__ = (
+        # get_pending_posts / pending count
+        Index("ix_scheduled_posts_status_scheduled_time", "status", "scheduled_time"),
+        # /api/automation/status: published today
+        Index("ix_scheduled_posts_status_published_at", "status", "published_at"),
+    )
 
 
 class AutomationLog(Base):
@@ -42,6 +49,12 @@ class AutomationLog(Base):
     details = Column(Text)
     notified = Column(Boolean, default=False)  # Whether Telegram notification was sent
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # check_and_notify_errors_task (errors, oldest first) and /api/automation/logs by level
+        Index("ix_automation_logs_level_created_at", "level", "created_at"),
+        Index("ix_automation_logs_created_at", "created_at"),
+    )
 
 
 class Language(Base):
@@ -0,0 +1,96 @@
+"""Keyset (cursor) pagination and column projection for list endpoints"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], model, allowed: set) -> Optional[list]:
+    """
+    Columns for ?fields=a,b,c (id and created_at are always included)
+
+    Returns None when no projection was requested.
+    """
+    if not fields:
+        return None
+    
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    
+    ordered = ["id", "created_at"] + [name for name in names if name not in ("id", "created_at")]
+    return [getattr(model, name) for name in dict.fromkeys(ordered)]
+
+
+def paginate(
+    db,
+    model,
+    response: Response,
+    filters: list,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    columns: Optional[list] = None
+):
+    """
+    Newest-first page of model rows, keyset-paginated on (created_at, id)
+
+    Each page is a range scan on the (created_at, id) indexes no matter how
+    deep the client pages. The cursor for the next page is returned in the
+    X-Next-Cursor header (absent on the last page). skip is kept for old
+    clients and only applies without a cursor.
+
+    With columns, only those are loaded and a JSONResponse of plain dicts is
+    returned instead of ORM objects.
+    """
+    query = db.query(*columns) if columns else db.query(model)
+    for condition in filters:
+        query = query.filter(condition)
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+    
+    rows = query.limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    if columns:
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return JSONResponse(jsonable_encoder([dict(row._mapping) for row in rows]), headers=headers)
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
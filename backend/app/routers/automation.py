@@ -1,14 +1,14 @@
 """Automation control endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import datetime
 from typing import List
 from .. import models
-from ..models_extended import ScheduledPost, AutomationLog, Language
+from ..models_extended import ScheduledPost, Language
+from ..config import settings
 from ..database import get_db
 from ..dependencies import get_current_user
 from ..services import scheduler_service
-from ..tasks.automation_tasks import create_daily_schedule_task, process_pending_posts_task
+from ..tasks.automation_tasks import create_daily_schedule_task, process_pending_posts_task, dispatch_post_pipelines
 
 router = APIRouter(prefix="/api/automation", tags=["automation"])
 
@@ -20,6 +20,9 @@ def create_schedule(
 ):
     """Create today's publishing schedule"""
     result = scheduler_service.create_daily_schedule(db)
+    
+    posts = scheduler_service.get_pending_posts(db, settings.PIPELINE_LEAD_MINUTES)
+    result["dispatched"] = dispatch_post_pipelines(db, posts)
     return result
 
 
@@ -90,12 +93,7 @@ def get_automation_logs(
     current_user: models.User = Depends(get_current_user)
 ):
     """Get automation logs"""
-    query = db.query(AutomationLog)
-    
-    if level:
-        query = query.filter(AutomationLog.level == level)
-    
-    logs = query.order_by(AutomationLog.created_at.desc()).limit(limit).all()
+    logs = scheduler_service.automation_logs_query(db, level, limit).all()
     
     return {"logs": [
         {
@@ -122,16 +120,10 @@ def get_automation_status(
     is_enabled = enabled_setting and enabled_setting.value == "true"
     
     # Count pending posts
-    pending_count = db.query(ScheduledPost).filter(
-        ScheduledPost.status == "pending"
-    ).count()
+    pending_count = scheduler_service.pending_count_query(db).count()
     
     # Count today's published
-    today_start = datetime.now().replace(hour=0, minute=0, second=0)
-    published_today = db.query(ScheduledPost).filter(
-        ScheduledPost.published_at >= today_start,
-        ScheduledPost.status == "published"
-    ).count()
+    published_today = scheduler_service.published_today_query(db).count()
     
     return {
         "enabled": is_enabled,
@@ -6,6 +6,7 @@ from ..database import get_db
 from ..dependencies import get_current_user
 from ..tasks.video_tasks import generate_scripts_task, generate_post_text_task, generate_video_task
 from ..services import generator
+from ..services.encoding import get_profile
 
 router = APIRouter(prefix="/api/generate", tags=["generator"])
 
@@ -28,10 +29,11 @@ def generate_scripts(
 @router.post("/post-text/{script_id}")
 def generate_post_text(
     script_id: int,
+    refresh: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Generate clean post text from script"""
+    """Generate clean post text from script (refresh=true bypasses the LLM cache)"""
     # Check if script exists
     script = db.query(models.Script).filter(models.Script.id == script_id).first()
     
@@ -40,7 +42,7 @@ def generate_post_text(
     
     # Generate synchronously (fast operation)
     try:
-        post_text = generator.generate_clean_post(script.script, script.theme, db)
+        post_text = generator.generate_clean_post(script.script, script.theme, db, use_cache=not refresh)
         
         # Update script
         script.post_text = post_text
@@ -71,6 +73,12 @@ def generate_video(
     logger.info(f"   Text Position: {request.text_position}")
     logger.info(f"   Custom Background: {request.custom_background}")
     logger.info(f"   Voice ID: {request.voice_id}")
+    logger.info(f"   Encoding: {request.encoding_profile} (preview first: {request.preview})")
+    
+    try:
+        get_profile(request.encoding_profile)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     # Check if script exists
     script = db.query(models.Script).filter(models.Script.id == request.script_id).first()
@@ -83,7 +91,9 @@ def generate_video(
         request.script_id,
         request.text_position,
         request.custom_background,
-        request.voice_id
+        request.voice_id,
+        request.encoding_profile,
+        request.preview
     )
     
     logger.info(f"✅ Started Celery task: {task.id}")
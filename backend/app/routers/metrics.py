@@ -0,0 +1,70 @@
+"""
+Render pipeline stage summaries (from video_stage_timings)
+
+Stage histograms for Prometheus are recorded when the spans are saved and
+served by /metrics (video_stage_duration_seconds), so scrapes run no SQL.
+"""
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from .. import models
+from ..database import get_db
+from ..dependencies import get_current_user
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/stages")
+def get_stage_summary(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Per-stage latency percentiles over the last hours, slowest total first"""
+    timing = models.VideoStageTiming
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    in_window = timing.created_at >= since
+    
+    # Aggregated in the database: the window can hold millions of spans
+    columns = [
+        timing.stage,
+        func.count(timing.id),
+        func.avg(timing.duration),
+        func.max(timing.duration),
+        func.sum(timing.duration),
+    ]
+    postgres = db.get_bind().dialect.name == "postgresql"
+    if postgres:
+        columns += [
+            func.percentile_disc(0.5).within_group(timing.duration),
+            func.percentile_disc(0.95).within_group(timing.duration),
+        ]
+    rows = db.query(*columns).filter(in_window).group_by(timing.stage).all()
+    
+    def percentile(stage: str, count: int, q: float) -> float:
+        """Nearest-rank percentile where percentile_disc is missing (SQLite in development)"""
+        return db.query(timing.duration).filter(in_window, timing.stage == stage).order_by(
+            timing.duration
+        ).offset(min(count - 1, int(q * count))).limit(1).scalar()
+    
+    grand_total = sum(row[4] for row in rows) or 1.0
+    
+    stages = []
+    for stage, count, avg, longest, total, *percentiles in rows:
+        p50, p95 = percentiles if postgres else (percentile(stage, count, 0.5), percentile(stage, count, 0.95))
+        stages.append({
+            "stage": stage,
+            "count": count,
+            "avg": avg,
+            "p50": p50,
+            "p95": p95,
+            "max": longest,
+            "total": total,
+            "share": total / grand_total,
+        })
+    stages.sort(key=lambda item: item["total"], reverse=True)
+    
+    videos = db.query(func.count(func.distinct(timing.video_id))).filter(in_window).scalar()
+    
+    return {"hours": hours, "videos": videos, "stages": stages}
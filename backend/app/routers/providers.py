@@ -0,0 +1,29 @@
+"""External provider rate limit / circuit breaker endpoints"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from .. import models
+from ..dependencies import get_current_user
+from ..services.rate_limiter import get_rate_limiter
+
+router = APIRouter(prefix="/api/providers", tags=["providers"])
+
+
+@router.get("/status")
+def get_providers_status(
+    current_user: models.User = Depends(get_current_user)
+):
+    """Token bucket level and circuit state per provider"""
+    return {"providers": get_rate_limiter().state()}
+
+
+@router.post("/{provider}/reset")
+def reset_provider(
+    provider: str,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Close the circuit and refill the bucket for a provider"""
+    try:
+        get_rate_limiter().reset(provider)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    
+    return {"provider": provider, "status": "reset"}
@@ -1,30 +1,45 @@
 """Scripts CRUD router"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import models, schemas
 from ..database import get_db
 from ..dependencies import get_current_user
+from ..pagination import paginate, parse_fields
 
 router = APIRouter(prefix="/api/scripts", tags=["scripts"])
 
+# Columns selectable with ?fields= (list views usually skip script / post_text bodies)
+SCRIPT_FIELDS = {"id", "theme", "hook", "caption", "status", "created_at", "updated_at", "script", "post_text"}
+
 
 @router.get("/", response_model=List[schemas.Script])
 def list_scripts(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     status_filter: str = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get all scripts with optional filtering"""
-    query = db.query(models.Script)
+    """
+    Get scripts, newest first, with optional filtering
     
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page;
+    ?fields=id,theme,hook,status returns only those columns.
+    """
+    filters = []
     if status_filter:
-        query = query.filter(models.Script.status == status_filter)
+        filters.append(models.Script.status == status_filter)
     
-    scripts = query.order_by(models.Script.created_at.desc()).offset(skip).limit(limit).all()
-    return scripts
+    return paginate(
+        db, models.Script, response, filters, limit,
+        cursor=cursor,
+        skip=skip,
+        columns=parse_fields(fields, models.Script, SCRIPT_FIELDS)
+    )
 
 
 @router.get("/{script_id}", response_model=schemas.Script)
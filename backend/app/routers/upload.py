@@ -1,5 +1,6 @@
 """File upload endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import os
 import shutil
@@ -8,6 +9,7 @@ from .. import models
 from ..database import get_db
 from ..dependencies import get_current_user
 from ..storage import BACKGROUNDS_DIR, init_storage
+from ..services.background_cache import get_background_cache
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
@@ -52,6 +54,9 @@ async def upload_background(
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
         
+        # Decode and scale once now, renders memory-map the result
+        await run_in_threadpool(get_background_cache().prepare, file_path)
+        
         # Save to settings
         setting = db.query(models.Setting).filter(
             models.Setting.key == "custom_background_path"
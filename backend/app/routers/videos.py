@@ -1,5 +1,5 @@
 """Videos CRUD router"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
@@ -9,26 +9,44 @@ from ..database import get_db
 from ..dependencies import get_current_user
 from ..config import settings
 from ..auth import decode_access_token
+from ..pagination import paginate, parse_fields
 
 router = APIRouter(prefix="/api/videos", tags=["videos"])
 
+# Columns selectable with ?fields=
+VIDEO_FIELDS = {
+    "id", "script_id", "video_path", "audio_path", "status", "generator", "duration",
+    "error_message", "encoding_profile", "preview_path", "created_at",
+}
+
 
 @router.get("/", response_model=List[schemas.Video])
 def list_videos(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     status_filter: str = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get all videos with optional filtering"""
-    query = db.query(models.Video)
+    """
+    Get videos, newest first, with optional filtering
     
+    Pass the X-Next-Cursor response header back as ?cursor= for the next page;
+    ?fields=id,status,video_path returns only those columns.
+    """
+    filters = []
     if status_filter:
-        query = query.filter(models.Video.status == status_filter)
+        filters.append(models.Video.status == status_filter)
     
-    videos = query.order_by(models.Video.created_at.desc()).offset(skip).limit(limit).all()
-    return videos
+    return paginate(
+        db, models.Video, response, filters, limit,
+        cursor=cursor,
+        skip=skip,
+        columns=parse_fields(fields, models.Video, VIDEO_FIELDS)
+    )
 
 
 @router.get("/{video_id}", response_model=schemas.Video)
@@ -71,6 +71,8 @@ class VideoBase(BaseModel):
     status: Optional[str] = "pending"
     generator: Optional[str] = None
     duration: Optional[int] = None
+    encoding_profile: Optional[str] = None
+    preview_path: Optional[str] = None
 
 
 class VideoCreate(VideoBase):
@@ -145,6 +147,8 @@ class GenerateVideoRequest(BaseModel):
     text_position: Optional[str] = "center"  # top, center, bottom
     custom_background: Optional[str] = None  # path to custom background
     voice_id: Optional[str] = None  # ElevenLabs voice ID
+    encoding_profile: Optional[str] = "publish"  # publish, publish_telegram, publish_youtube, ... or preview
+    preview: bool = True  # deliver a fast preview first, publish encode runs in background
 
 
 class GenerateVideoResponse(BaseModel):
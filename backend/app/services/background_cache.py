@@ -0,0 +1,146 @@
+"""
+Pre-scaled background frames
+
+Every background is decoded, scaled to cover 1080x1920 and center-cropped
+once, then stored as an .npy frame under STORAGE_PATH/cache/backgrounds keyed
+by the SHA-256 of the source file. Renders open the frame with
+np.load(mmap_mode="r"): pages come straight from the OS page cache, are shared
+by every renderer process on the host and are never copied or resampled.
+
+Content keys survive renames (prefetched images are moved into place) and
+re-uploads of the same image under another name. The directory is bounded by
+BACKGROUND_CACHE_MAX_MB; least recently used frames are dropped first.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from ..config import settings
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+TOUCH_INTERVAL = 60  # seconds between LRU timestamp updates of a frame
+
+
+class BackgroundCache:
+    """Content-addressed store of normalized, memory-mappable background frames"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._digests: dict = {}  # (path, mtime_ns, size) -> digest
+        self._lock = threading.Lock()
+
+    def digest(self, source: Path) -> str:
+        """SHA-256 of the source file, memoized per file version"""
+        stat = source.stat()
+        version = (str(source), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(version)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            with self._lock:
+                self._digests[version] = digest
+        return digest
+
+    def frame_path(self, digest: str) -> Path:
+        return self.root / f"{digest}.npy"
+
+    def prepare(self, source: Path) -> Path:
+        """Normalize source into the cache if needed, return the .npy path"""
+        from .compositor import _prepare_background
+
+        target = self.frame_path(self.digest(source))
+        if target.exists():
+            return target
+
+        started = time.perf_counter()
+        frame = _prepare_background(source)
+        tmp_path = target.with_name(f".{target.stem}.{os.getpid()}.{threading.get_ident()}.npy")
+        np.save(tmp_path, np.ascontiguousarray(frame))
+        os.replace(tmp_path, target)
+        logger.info(f"🖼️ Prepared background {source.name} → {target.name[:12]} ({time.perf_counter() - started:.2f}s)")
+
+        self._evict(keep=target)
+        return target
+
+    def load(self, source: Path) -> np.ndarray:
+        """Read-only memory-mapped 1080x1920 RGB frame for source"""
+        telemetry.record_cache("background_frame", self.frame_path(self.digest(source)).exists())
+        target = self.prepare(source)
+        try:
+            if time.time() - target.stat().st_mtime > TOUCH_INTERVAL:
+                os.utime(target)
+        except FileNotFoundError:
+            # Evicted by another process right after prepare
+            target = self.prepare(source)
+        return _open_frame(str(target))
+
+    def prepare_dir(self, directory: Path) -> int:
+        """Prepare every image in directory, returns how many were new"""
+        created = 0
+        for source in sorted(directory.iterdir()):
+            if not source.is_file() or source.suffix.lower() not in SOURCE_EXTENSIONS:
+                continue
+            try:
+                if not self.frame_path(self.digest(source)).exists():
+                    self.prepare(source)
+                    created += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Could not prepare background {source.name}: {e}")
+        return created
+
+    def _evict(self, keep: Path):
+        frames = []
+        for path in self.root.glob("*.npy"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            frames.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in frames)
+        for _, size, path in sorted(frames):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Open memory maps in other renderers stay valid after unlink
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.info(f"🧹 Evicted background frame {path.name[:12]}")
+
+
+@lru_cache(maxsize=32)
+def _open_frame(path_str: str) -> np.ndarray:
+    return np.load(path_str, mmap_mode="r")
+
+
+_cache: Optional[BackgroundCache] = None
+
+
+def get_background_cache() -> BackgroundCache:
+    """Process-wide cache under STORAGE_PATH/cache/backgrounds"""
+    global _cache
+    if _cache is None:
+        _cache = BackgroundCache(
+            Path(settings.STORAGE_PATH) / "cache" / "backgrounds",
+            max_bytes=settings.BACKGROUND_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _cache
@@ -0,0 +1,273 @@
+"""
+Native frame compositor for subtitle videos
+
+The background is static, so every subtitle card is rasterized once into an
+RGBA buffer (text_render: glyph atlas and card cache), alpha-blended with NumPy
+onto a memory-mapped 1080x1920 background (background_cache) and the resulting
+raw frames are piped straight into ffmpeg.
+"""
+
+import logging
+import re
+import shutil
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageFont
+
+from ..config import settings
+from . import text_render
+from .encoding import EncodingProfile, get_profile
+from .stage_timing import StageTimer, timer_or_null
+
+logger = logging.getLogger(__name__)
+
+FRAME_WIDTH = 1080
+FRAME_HEIGHT = 1920
+FPS = 24
+
+FONT_CANDIDATES = [
+    "Arial.ttf",
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+]
+
+
+@lru_cache(maxsize=1)
+def find_ffmpeg() -> str:
+    """Locate ffmpeg binary (imageio-ffmpeg ships one with MoviePy)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        pass
+
+    path = shutil.which("ffmpeg")
+    if not path:
+        raise RuntimeError("ffmpeg not found! Install ffmpeg or imageio-ffmpeg.")
+    return path
+
+
+def probe_duration(media_path: Path) -> float:
+    """Get media duration in seconds from ffmpeg header output"""
+    result = subprocess.run(
+        [find_ffmpeg(), "-hide_banner", "-i", str(media_path)],
+        capture_output=True,
+        text=True
+    )
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        raise ValueError(f"Could not read duration of {media_path}")
+
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+@lru_cache(maxsize=8)
+def load_font(size: int) -> ImageFont.FreeTypeFont:
+    """Resolve subtitle font once per size"""
+    candidates = [settings.SUBTITLE_FONT] if settings.SUBTITLE_FONT else []
+    for candidate in candidates + FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+
+    logger.warning("⚠️ No TrueType font found, using Pillow default font")
+    return ImageFont.load_default(size=size)
+
+
+def render_subtitle_card(
+    text: str,
+    font_size: int = 50,
+    width: int = 980,
+    stroke_width: int = 3
+) -> np.ndarray:
+    """
+    Subtitle card (white text, black stroke) from the glyph atlas / card cache
+
+    Returns:
+        Read-only RGBA uint8 array of shape (height, width, 4)
+    """
+    return text_render.render_card(text, load_font(font_size), width, stroke_width)
+
+
+def _prepare_background(path: Path) -> np.ndarray:
+    """Decode background, scale to cover 1080x1920 and center-crop"""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        scale = max(FRAME_HEIGHT / img.height, FRAME_WIDTH / img.width)
+        resized = (max(FRAME_WIDTH, round(img.width * scale)), max(FRAME_HEIGHT, round(img.height * scale)))
+        img = img.resize(resized, Image.LANCZOS)
+
+        left = (resized[0] - FRAME_WIDTH) // 2
+        top = (resized[1] - FRAME_HEIGHT) // 2
+        img = img.crop((left, top, left + FRAME_WIDTH, top + FRAME_HEIGHT))
+        return np.asarray(img)
+
+
+def load_background(path: Path) -> np.ndarray:
+    """Pre-resized background frame, memory-mapped from the background cache"""
+    from .background_cache import get_background_cache
+
+    return get_background_cache().load(path)
+
+
+def blend(background: np.ndarray, card: np.ndarray, x: int, y: int) -> np.ndarray:
+    """Alpha-blend an RGBA card onto a copy of an RGB frame at (x, y)"""
+    frame = background.copy()
+
+    # Clip card to frame bounds
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + card.shape[1], frame.shape[1])
+    y1 = min(y + card.shape[0], frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return frame
+
+    patch = card[y0 - y:y1 - y, x0 - x:x1 - x]
+    alpha = patch[..., 3:4].astype(np.uint16)
+    region = frame[y0:y1, x0:x1].astype(np.uint16)
+
+    frame[y0:y1, x0:x1] = (
+        (patch[..., :3] * alpha + region * (255 - alpha) + 127) // 255
+    ).astype(np.uint8)
+    return frame
+
+
+def text_y_position(text_position: str) -> int:
+    """Top edge of subtitle card for 'top' / 'center' / 'bottom'"""
+    if text_position == "top":
+        return 100
+    if text_position == "bottom":
+        return FRAME_HEIGHT - 200
+    return FRAME_HEIGHT // 2 - 100
+
+
+def render_video(
+    background_path: Path,
+    audio_path: Path,
+    cues: list[tuple[float, float, str]],
+    output_path: Path,
+    text_position: str = "center",
+    duration: Optional[float] = None,
+    fps: Optional[int] = None,
+    background: Optional[np.ndarray] = None,
+    profile: Optional[EncodingProfile] = None,
+    timer: Optional[StageTimer] = None
+) -> Path:
+    """
+    Composite subtitle cues over a static background and encode with audio
+
+    Args:
+        background_path: Background image
+        audio_path: Voiceover track
+        cues: List of (start, end, text) in seconds
+        output_path: Target .mp4 path
+        text_position: "top", "center" or "bottom"
+        duration: Video duration (probed from audio if not given)
+        fps: Output frame rate (profile fps by default)
+        background: Pre-decoded frame (skips loading background_path)
+        profile: Encoding profile (publish by default)
+        timer: Optional StageTimer for the composite / encode spans
+
+    Returns:
+        output_path
+    """
+    profile = profile or get_profile(None)
+    fps = fps or profile.fps
+    timer = timer_or_null(timer)
+    
+    if duration is None:
+        duration = probe_duration(audio_path)
+
+    if background is None:
+        background = load_background(background_path)
+    y_pos = text_y_position(text_position)
+
+    # Composite at full size, then scale the few distinct frames down for smaller profiles
+    out_size = (profile.width, profile.height)
+    
+    def to_output(frame: np.ndarray) -> bytes:
+        if out_size != (FRAME_WIDTH, FRAME_HEIGHT):
+            frame = np.asarray(Image.fromarray(frame).resize(out_size, Image.BILINEAR))
+        return frame.tobytes()
+    
+    # The picture is constant inside a cue: composite its frame when the cue
+    # becomes active and keep only that one in memory
+    started = time.perf_counter()
+    background_bytes = to_output(background)
+    background_seconds = time.perf_counter() - started
+    composite_seconds = 0.0
+
+    def cue_frame(text: str) -> bytes:
+        nonlocal composite_seconds
+        started = time.perf_counter()
+        card = render_subtitle_card(text)
+        x_pos = (FRAME_WIDTH - card.shape[1]) // 2
+        frame = to_output(blend(background, card, x_pos, y_pos))
+        composite_seconds += time.perf_counter() - started
+        return frame
+
+    total_frames = int(np.ceil(duration * fps))
+
+    command = [
+        find_ffmpeg(), "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{profile.width}x{profile.height}", "-r", str(fps),
+        "-i", "-",
+        "-i", str(audio_path),
+        "-map", "0:v", "-map", "1:a",
+        *profile.video_args(),
+        *profile.audio_args(),
+        *profile.container_args(),
+        "-shortest",
+        str(output_path)
+    ]
+
+    encode_started = time.perf_counter()
+    status = "error"
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            cue_index = 0
+            active_index, active_frame = None, None
+            for frame_index in range(total_frames):
+                t = frame_index / fps
+                while cue_index < len(cues) and t >= cues[cue_index][1]:
+                    cue_index += 1
+
+                if cue_index < len(cues) and t >= cues[cue_index][0]:
+                    if active_index != cue_index:
+                        active_index, active_frame = cue_index, cue_frame(cues[cue_index][2])
+                    process.stdin.write(active_frame)
+                else:
+                    process.stdin.write(background_bytes)
+
+            process.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg died early - its stderr explains why
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+
+        stderr = process.stderr.read().decode("utf-8", errors="replace")
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.strip()}")
+        status = "ok"
+    finally:
+        # Cue frames are composited while encoding; report them as their own stage
+        encode_seconds = time.perf_counter() - encode_started - composite_seconds
+        timer.extend([
+            ("composite", background_seconds + composite_seconds, status),
+            ("encode", encode_seconds, status)
+        ])
+
+    return output_path
@@ -0,0 +1,77 @@
+"""
+ffmpeg encoding profiles
+
+Two tiers:
+- preview: ultrafast, half resolution - for moderators to review in seconds
+- publish*: final quality, tuned per target platform
+
+Only portable libx264/aac options are used so the same profiles work on any
+host without hardware encoders.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    name: str
+    width: int
+    height: int
+    preset: str
+    crf: int
+    fps: int = 24
+    audio_bitrate: str = "128k"
+    maxrate: Optional[str] = None  # caps bitrate peaks (requires bufsize)
+    bufsize: Optional[str] = None
+    threads: int = 0  # 0 = ffmpeg decides
+    faststart: bool = True  # moov atom first, playback starts before full download
+
+    @property
+    def is_preview(self) -> bool:
+        return self.name == PREVIEW_PROFILE
+
+    def video_args(self) -> list[str]:
+        """libx264 output options"""
+        args = [
+            "-c:v", "libx264",
+            "-preset", self.preset,
+            "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p",
+            "-threads", str(self.threads),
+        ]
+        if self.maxrate:
+            args += ["-maxrate", self.maxrate, "-bufsize", self.bufsize or self.maxrate]
+        return args
+
+    def audio_args(self) -> list[str]:
+        return ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+    def container_args(self) -> list[str]:
+        return ["-movflags", "+faststart"] if self.faststart else []
+
+
+PREVIEW_PROFILE = "preview"
+DEFAULT_PUBLISH_PROFILE = "publish"
+
+PROFILES = {
+    profile.name: profile for profile in (
+        EncodingProfile("preview", 540, 960, preset="ultrafast", crf=30, audio_bitrate="96k", faststart=False),
+        EncodingProfile("publish", 1080, 1920, preset="medium", crf=21, audio_bitrate="160k"),
+        # Telegram Bot API uploads are limited to 50 MB
+        EncodingProfile("publish_telegram", 1080, 1920, preset="medium", crf=23, maxrate="4M", bufsize="8M"),
+        # YouTube re-encodes everything - give it a high quality source
+        EncodingProfile("publish_youtube", 1080, 1920, preset="slow", crf=18, audio_bitrate="192k"),
+        # Reels: H.264, <= 30 fps, AAC 128k recommended, keep peaks moderate
+        EncodingProfile("publish_instagram", 1080, 1920, preset="medium", crf=21, maxrate="8M", bufsize="16M"),
+        EncodingProfile("publish_tiktok", 1080, 1920, preset="medium", crf=21, maxrate="10M", bufsize="20M"),
+    )
+}
+
+
+def get_profile(name: Optional[str]) -> EncodingProfile:
+    """Profile by name (publish when name is empty)"""
+    profile = PROFILES.get(name or DEFAULT_PUBLISH_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown encoding profile: {name}. Available: {', '.join(PROFILES)}")
+    return profile
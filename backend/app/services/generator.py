@@ -1,11 +1,14 @@
 """Script generation service using Groq API"""
+import asyncio
 import random
 import re
 import logging
-from groq import Groq
+from groq import Groq, AsyncGroq
 from sqlalchemy.orm import Session
 from ..config import settings
 from .. import models
+from .llm_cache import get_llm_cache
+from . import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +24,7 @@ def get_setting(db: Session, key: str, default=None):
     return setting.value if setting else default
 
 
-def generate_clean_post(scenario: str, theme: str = "", db: Session = None) -> str:
+def generate_clean_post(scenario: str, theme: str = "", db: Session = None, use_cache: bool = True) -> str:
     """
     Генерирует чистый текст поста из сценария/промпта.
     Возвращает текст без разметки, звездочек, ##, готовый для озвучки.
@@ -30,6 +33,7 @@ def generate_clean_post(scenario: str, theme: str = "", db: Session = None) -> s
         scenario: Контекст/промпт/сценарий для поста
         theme: Тема (опционально)
         db: Database session (optional)
+        use_cache: False - игнорировать кэш и запросить новый текст
     
     Returns:
         Чистый текст для озвучки
@@ -50,17 +54,30 @@ def generate_clean_post(scenario: str, theme: str = "", db: Session = None) -> s
 
 Напиши текст для озвучки:"""
         
-        completion = groq_client.chat.completions.create(
-            model="openai/gpt-oss-120b",
-            messages=[
+        request = {
+            "model": "openai/gpt-oss-120b",
+            "messages": [
                 {"role": "system", "content": "Ты — мистический поэт и философ. Создаёшь глубокие, атмосферные тексты для эзотерических видео. Пиши красиво, образно, вдохновляюще."},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0.95,
-            max_tokens=1000
-        )
+            "temperature": 0.95,
+            "max_tokens": 1000
+        }
+        
+        cache = get_llm_cache() if settings.LLM_CACHE_ENABLED else None
+        cache_key = cache.make_key(**request) if cache else None
+        cached = cache.get(cache_key) if cache and use_cache else None
+        
+        if cached:
+            logger.info(f"♻️ Текст поста из кэша ({cache_key[4:16]})")
+            raw_text = cached
+        else:
+            with rate_limiter.guard("groq"):
+                completion = groq_client.chat.completions.create(**request)
+            raw_text = completion.choices[0].message.content.strip()
+            if cache:
+                cache.set(cache_key, raw_text)
         
-        raw_text = completion.choices[0].message.content.strip()
         logger.info(f"📝 Получен текст от GPT ({len(raw_text)} символов)")
         logger.info(f"📄 Текст: {raw_text[:200]}...")
         
@@ -94,13 +111,77 @@ def generate_clean_post(scenario: str, theme: str = "", db: Session = None) -> s
         return clean.strip()
 
 
-def generate_scripts(db: Session, count: int = 1) -> list[dict]:
+def _script_request(theme: str, system_prompt: str) -> dict:
+    """Параметры chat completion для одного сценария"""
+    user_prompt = f"Topic: {theme}. Give me a punchy 15-30 second video script."
+    
+    return {
+        "model": "openai/gpt-oss-120b",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.8,
+        "max_tokens": 500
+    }
+
+
+def _build_script_data(completion, theme: str, caption_template: str) -> dict:
+    script = completion.choices[0].message.content.strip()
+    hook = script.split("\n")[0][:80]  # первая строка = хук
+    caption = caption_template.format(hook=hook)
+    
+    return {
+        "theme": theme,
+        "script": script,
+        "hook": hook,
+        "caption": caption
+    }
+
+
+async def _generate_scripts_concurrent(
+    script_themes: list[str],
+    system_prompt: str,
+    caption_template: str,
+    concurrency: int
+) -> list[dict]:
+    """Параллельная генерация через AsyncGroq с ограничением concurrency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(script_themes)
+    
+    # Клиент на один вызов: httpx-пул привязан к event loop текущего asyncio.run
+    async with AsyncGroq(api_key=settings.GROQ_API_KEY) as client:
+        
+        async def generate_one(i: int, theme: str):
+            async with semaphore:
+                logger.info(f"Генерация сценария {i+1}/{total} на тему: {theme}")
+                try:
+                    async with rate_limiter.async_guard("groq"):
+                        completion = await client.chat.completions.create(
+                            **_script_request(theme, system_prompt)
+                        )
+                    script_data = _build_script_data(completion, theme, caption_template)
+                    logger.info(f"Сценарий {i+1} успешно создан: {script_data['hook']}")
+                    return script_data
+                except Exception as e:
+                    logger.error(f"Ошибка при генерации сценария {i+1}: {e}")
+                    return None
+        
+        results = await asyncio.gather(
+            *(generate_one(i, theme) for i, theme in enumerate(script_themes))
+        )
+    
+    return [script_data for script_data in results if script_data]
+
+
+def generate_scripts(db: Session, count: int = 1, concurrency: int = None) -> list[dict]:
     """
     Генерирует сценарии для видео
     
     Args:
         db: Database session
         count: Количество сценариев для генерации
+        concurrency: Макс. параллельных запросов к Groq (по умолчанию GROQ_CONCURRENCY)
     
     Returns:
         Список словарей {script, hook, caption, theme}
@@ -125,43 +206,33 @@ def generate_scripts(db: Session, count: int = 1) -> list[dict]:
             "{hook}\n\n#astrology #numerology #humandesign #shorts"
         )
         
-        scripts = []
         themes_today = random.sample(themes, k=min(len(themes), count))
+        script_themes = [random.choice(themes_today) if themes_today else "astrology" for _ in range(count)]
         
-        for i in range(count):
-            theme = random.choice(themes_today) if themes_today else "astrology"
-            logger.info(f"Генерация сценария {i+1}/{count} на тему: {theme}")
-            
-            user_prompt = f"Topic: {theme}. Give me a punchy 15-30 second video script."
-            
-            try:
-                completion = groq_client.chat.completions.create(
-                    model="openai/gpt-oss-120b",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.8,
-                    max_tokens=500
-                )
-                
-                script = completion.choices[0].message.content.strip()
-                hook = script.split("\n")[0][:80]  # первая строка = хук
-                caption = caption_template.format(hook=hook)
-                
-                script_data = {
-                    "theme": theme,
-                    "script": script,
-                    "hook": hook,
-                    "caption": caption
-                }
-                
-                scripts.append(script_data)
-                logger.info(f"Сценарий {i+1} успешно создан: {hook}")
+        if concurrency is None:
+            concurrency = settings.GROQ_CONCURRENCY
+        
+        if count > 1 and concurrency > 1:
+            # Все запросы параллельно, не более concurrency одновременно
+            scripts = asyncio.run(
+                _generate_scripts_concurrent(script_themes, system_prompt, caption_template, concurrency)
+            )
+        else:
+            scripts = []
+            for i, theme in enumerate(script_themes):
+                logger.info(f"Генерация сценария {i+1}/{count} на тему: {theme}")
                 
-            except Exception as e:
-                logger.error(f"Ошибка при генерации сценария {i+1}: {e}")
-                continue
+                try:
+                    with rate_limiter.guard("groq"):
+                        completion = groq_client.chat.completions.create(
+                            **_script_request(theme, system_prompt)
+                        )
+                    scripts.append(_build_script_data(completion, theme, caption_template))
+                    logger.info(f"Сценарий {i+1} успешно создан: {scripts[-1]['hook']}")
+                    
+                except Exception as e:
+                    logger.error(f"Ошибка при генерации сценария {i+1}: {e}")
+                    continue
         
         logger.info(f"Всего создано сценариев: {len(scripts)}")
         return scripts
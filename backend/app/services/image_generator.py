@@ -3,13 +3,21 @@ Image Generation Service for Esoteric Themes
 Генерация изображений для астрологии, нумерологии, матрицы судьбы, Human Design
 """
 
+import fcntl
+import hashlib
 import os
+import random
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import quote
-from datetime import datetime
 from typing import Optional
 
+from . import rate_limiter, telemetry
+
+
 class ImageGenerator:
     """Generate esoteric-themed images using Pollinations.ai (FREE!)"""
     
@@ -27,10 +35,83 @@ class ImageGenerator:
         "sacred_geometry": "Sacred geometry patterns, flower of life, metatron cube, divine proportions, golden ratio, spiritual symbols"
     }
     
+    # Renderer frame size (vertical shorts)
+    RENDER_SIZE = (1080, 1920)
+    
+    # One lock per cache key, shared by all generators in this process
+    _key_locks: dict = {}
+    _key_locks_guard = threading.Lock()
+    
     def __init__(self, storage_path: str = None):
         """Initialize image generator"""
         self.storage_path = Path(storage_path) if storage_path else Path("storage/backgrounds")
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.prefetch_path = self.storage_path / "prefetch"
+    
+    def _get_prompt(self, theme: str, custom_prompt: str = None) -> str:
+        if custom_prompt:
+            return custom_prompt
+        return self.THEME_PROMPTS.get(theme, self.THEME_PROMPTS["cosmic"])
+    
+    @staticmethod
+    def _image_url(prompt: str, width: int, height: int, seed: int = None) -> str:
+        encoded_prompt = quote(prompt)
+        url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true"
+        if seed is not None:
+            url += f"&seed={seed}"
+        return url
+    
+    @staticmethod
+    def cache_key(prompt: str, width: int, height: int, seed: int = None) -> str:
+        """Prompt digest plus dimensions (and seed for prefetched variants)"""
+        digest = hashlib.sha256(f"{prompt}|{seed}".encode("utf-8")).hexdigest()[:16]
+        return f"{digest}_{width}x{height}"
+    
+    @classmethod
+    def _lock_for(cls, key: str) -> threading.Lock:
+        with cls._key_locks_guard:
+            return cls._key_locks.setdefault(key, threading.Lock())
+    
+    @staticmethod
+    def _download(url: str, filepath: Path):
+        """Download to a temp file and atomically move into place"""
+        with rate_limiter.guard("pollinations"):
+            response = requests.get(url, timeout=60)
+            response.raise_for_status()
+        
+        tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, filepath)
+    
+    def _fetch_cached(self, filepath: Path, url: str, key: str) -> Path:
+        """
+        Fetch url into filepath unless already there.
+        
+        Identical concurrent requests wait on the same lock (threads) and
+        lock file (worker processes), so the image is downloaded only once.
+        The lock file is removed by its holder; waiters re-check filepath
+        after acquiring, so a late arrival on a fresh lock file never
+        downloads again.
+        """
+        if filepath.exists():
+            telemetry.record_cache("image", True)
+            return filepath
+        telemetry.record_cache("image", False)
+        
+        lock_path = filepath.with_name(f".{filepath.name}.lock")
+        with self._lock_for(key):
+            with open(lock_path, "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if not filepath.exists():
+                        self._download(url, filepath)
+                        print(f"✅ Background generated: {filepath}")
+                finally:
+                    lock_path.unlink(missing_ok=True)
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        
+        return filepath
     
     def generate_background(
         self,
@@ -42,6 +123,8 @@ class ImageGenerator:
         """
         Generate background image for video
         
+        Identical theme/prompt/size requests reuse the cached file.
+        
         Args:
             theme: Theme name (astrology, numerology, matrix, etc.)
             width: Image width in pixels
@@ -51,31 +134,12 @@ class ImageGenerator:
         Returns:
             Path to saved image file
         """
-        # Get prompt
-        if custom_prompt:
-            prompt = custom_prompt
-        else:
-            prompt = self.THEME_PROMPTS.get(theme, self.THEME_PROMPTS["cosmic"])
-        
-        # Generate image URL
-        encoded_prompt = quote(prompt)
-        image_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true"
+        prompt = self._get_prompt(theme, custom_prompt)
+        key = self.cache_key(prompt, width, height)
+        filepath = self.storage_path / f"{theme}_{key}.png"
         
         try:
-            # Download image
-            response = requests.get(image_url, timeout=60)
-            response.raise_for_status()
-            
-            # Save to storage
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{theme}_{timestamp}.png"
-            filepath = self.storage_path / filename
-            
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-            
-            print(f"✅ Background generated: {filepath}")
-            return str(filepath)
+            return str(self._fetch_cached(filepath, self._image_url(prompt, width, height), key))
             
         except Exception as e:
             print(f"❌ Error generating background: {e}")
@@ -85,6 +149,83 @@ class ImageGenerator:
                 return str(default)
             raise
     
+    def sweep_locks(self, max_age: float = 3600) -> int:
+        """Remove lock files left behind by crashed downloads"""
+        removed = 0
+        cutoff = time.time() - max_age
+        for lock_path in self.storage_path.rglob(".*.png.lock"):
+            try:
+                if lock_path.stat().st_mtime < cutoff:
+                    lock_path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    def prefetched_count(self, theme: str) -> int:
+        theme_dir = self.prefetch_path / theme
+        if not theme_dir.exists():
+            return 0
+        return len(list(theme_dir.glob("*.png")))
+    
+    def prefetch(self, per_theme: int = 3, themes: list = None, workers: int = 2) -> int:
+        """
+        Keep per_theme ready render-size backgrounds for every theme
+        
+        Each variant uses its own Pollinations seed. Returns number of new images.
+        """
+        width, height = self.RENDER_SIZE
+        jobs = []
+        for theme in themes or self.THEME_PROMPTS:
+            missing = per_theme - self.prefetched_count(theme)
+            if missing <= 0:
+                continue
+            
+            theme_dir = self.prefetch_path / theme
+            theme_dir.mkdir(parents=True, exist_ok=True)
+            prompt = self._get_prompt(theme)
+            for _ in range(missing):
+                seed = random.randint(1, 2**31 - 1)
+                key = self.cache_key(prompt, width, height, seed)
+                jobs.append((theme_dir / f"{key}.png", self._image_url(prompt, width, height, seed), key))
+        
+        if not jobs:
+            return 0
+        
+        created = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._fetch_cached, *job) for job in jobs]
+            for future in futures:
+                try:
+                    future.result()
+                    created += 1
+                except Exception as e:
+                    print(f"❌ Prefetch failed: {e}")
+        
+        print(f"✅ Prefetched {created} backgrounds")
+        return created
+    
+    def take_prefetched(self, theme: str = "cosmic") -> Optional[str]:
+        """
+        Claim a ready render-size background for theme, or None if the pool is empty
+        
+        The file is moved out of the pool into the backgrounds directory.
+        """
+        theme_dir = self.prefetch_path / theme
+        if not theme_dir.exists():
+            return None
+        
+        for candidate in sorted(theme_dir.glob("*.png"), key=lambda p: p.stat().st_mtime):
+            target = self.storage_path / f"{theme}_{candidate.name}"
+            try:
+                # Atomic claim: only one worker wins the rename
+                os.rename(candidate, target)
+            except FileNotFoundError:
+                continue
+            return str(target)
+        
+        return None
+    
     def generate_cover(
         self,
         theme: str,
@@ -162,9 +303,7 @@ class ImageGenerator:
         Returns:
             Direct image URL
         """
-        prompt = self.THEME_PROMPTS.get(theme, self.THEME_PROMPTS["cosmic"])
-        encoded_prompt = quote(prompt)
-        return f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true"
+        return self._image_url(self._get_prompt(theme), width, height)
 
 
 # Example usage
@@ -0,0 +1,123 @@
+"""
+Response cache for LLM chat completions
+
+Keyed on model, messages, temperature and max_tokens. Stored in Redis with
+a TTL; if Redis is unreachable a local SQLite file is used instead.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import redis
+
+from ..config import settings
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "llm:"
+
+
+class LLMCache:
+    """Redis-backed completion cache with SQLite fallback"""
+
+    def __init__(self, redis_url: str, sqlite_path: Path, default_ttl: int):
+        self.default_ttl = default_ttl
+        self.sqlite_path = Path(sqlite_path)
+        self._redis = redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+        self._sqlite_lock = threading.Lock()
+        self._sqlite_ready = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, messages: list, temperature: float, max_tokens: int) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _sqlite(self) -> sqlite3.Connection:
+        if not self._sqlite_ready:
+            self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.sqlite_path, timeout=5)
+        if not self._sqlite_ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._sqlite_ready = True
+        return conn
+
+    def _sqlite_get(self, key: str) -> Optional[str]:
+        with self._sqlite_lock:
+            conn = self._sqlite()
+            try:
+                row = conn.execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+                return row[0] if row else None
+            finally:
+                conn.close()
+
+    def _sqlite_set(self, key: str, value: str, ttl: int):
+        with self._sqlite_lock:
+            conn = self._sqlite()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, time.time() + ttl)
+                    )
+                    conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            finally:
+                conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self._redis.get(key)
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ LLM cache: Redis unavailable ({e}), using SQLite")
+            value = self._sqlite_get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        telemetry.record_cache("llm", value is not None)
+        return value
+
+    def set(self, key: str, value: str, ttl: int = None):
+        ttl = ttl or self.default_ttl
+        try:
+            self._redis.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ LLM cache: Redis unavailable ({e}), using SQLite")
+            self._sqlite_set(key, value, ttl)
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        sqlite_path = settings.LLM_CACHE_SQLITE_PATH or str(Path(settings.STORAGE_PATH) / "cache" / "llm_cache.sqlite3")
+        _cache = LLMCache(settings.REDIS_URL, Path(sqlite_path), settings.LLM_CACHE_TTL)
+    return _cache
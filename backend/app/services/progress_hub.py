@@ -0,0 +1,132 @@
+"""
+Async progress fan-out for /ws/progress/{task_id}
+
+One Redis subscriber per process listens on progress:* and dispatches
+messages to per-client asyncio queues, so WebSocket handlers never block
+the event loop.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "progress:"
+
+
+class ProgressHub:
+    """Multiplexes progress:* Redis channels to WebSocket client queues"""
+
+    def __init__(self, redis_url: str, queue_size: int = 100):
+        self.redis_url = redis_url
+        self.queue_size = queue_size
+        self._clients: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._redis: Optional[aioredis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Start the shared subscriber (idempotent)"""
+        async with self._lock:
+            if self._listener and not self._listener.done():
+                return
+            self._redis = aioredis.from_url(self.redis_url)
+            self._listener = asyncio.create_task(self._listen())
+            logger.info("✅ Progress hub started")
+
+    async def stop(self):
+        """Stop the subscriber and release all clients"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+
+        self._clients.clear()
+        logger.info("Progress hub stopped")
+
+    async def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Register a client queue for a task"""
+        await self.start()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._clients[task_id].add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        """Remove a client queue"""
+        queues = self._clients.get(task_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._clients[task_id]
+
+    def client_count(self) -> int:
+        return sum(len(queues) for queues in self._clients.values())
+
+    def _dispatch(self, task_id: str, data: str):
+        for queue in list(self._clients.get(task_id, ())):
+            if queue.full():
+                # Slow client: drop the oldest update, progress is superseded anyway
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(data)
+
+    async def _listen(self):
+        """Single pattern subscription, reconnects on Redis errors"""
+        backoff = 1
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+
+                    channel = message["channel"]
+                    data = message["data"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode("utf-8")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+
+                    self._dispatch(channel[len(CHANNEL_PREFIX):], data)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress hub Redis error: {e}, reconnecting in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def is_terminal(data: str) -> bool:
+    """Check if a progress message is the final one for its task"""
+    try:
+        return json.loads(data).get("status") in ("completed", "failed")
+    except (ValueError, AttributeError):
+        return False
+
+
+progress_hub = ProgressHub(settings.REDIS_URL, queue_size=settings.WS_QUEUE_SIZE)
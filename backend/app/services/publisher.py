@@ -4,7 +4,10 @@ from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 import tempfile
+import threading
 import urllib.request
+from contextlib import contextmanager
+from . import rate_limiter
 
 load_dotenv()
 
@@ -35,6 +38,116 @@ def download_video(video_url: str) -> str:
         logger.error(f"Ошибка скачивания видео: {e}")
         raise
 
+
+class VideoArtifacts:
+    """
+    Общая локальная копия видео на время публикации.
+
+    file:// и /storage/ пути используются напрямую без копирования.
+    Удалённые URL скачиваются один раз во временный файл, который
+    удаляется после того, как его отпустит последний загрузчик.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # video_url -> {"path", "refs", "ready", "error"}
+
+    @staticmethod
+    def resolve_local(video_url: str):
+        """Путь к уже существующему локальному файлу или None."""
+        if video_url.startswith("file://"):
+            return video_url[len("file://"):]
+
+        if video_url.startswith("/storage/"):
+            from .. import storage as storage_module
+            if not storage_module.STORAGE_ROOT:
+                storage_module.init_storage()
+            return str(storage_module.STORAGE_ROOT / video_url[len("/storage/"):])
+
+        if os.path.isabs(video_url) and os.path.exists(video_url):
+            return video_url
+
+        return None
+
+    def acquire(self, video_url: str, fetch: bool = True):
+        """
+        Взять ссылку на копию видео.
+
+        fetch=False только удерживает копию (скачается при первом fetch=True),
+        так пустая публикация, например только в Instagram, ничего не качает.
+        """
+        local_path = self.resolve_local(video_url)
+        if local_path:
+            return local_path
+
+        with self._lock:
+            entry = self._entries.get(video_url)
+            if entry is None:
+                entry = {"path": None, "refs": 0, "ready": threading.Event(), "fetching": False, "error": None}
+                self._entries[video_url] = entry
+            entry["refs"] += 1
+
+            owner = fetch and not entry["fetching"]
+            if owner:
+                entry["fetching"] = True
+
+        if not fetch:
+            return None
+
+        if owner:
+            try:
+                entry["path"] = download_video(video_url)
+            except Exception as e:
+                entry["error"] = e
+            finally:
+                entry["ready"].set()
+        else:
+            entry["ready"].wait()
+
+        if entry["error"]:
+            self.release(video_url)
+            raise entry["error"]
+
+        return entry["path"]
+
+    def release(self, video_url: str):
+        if self.resolve_local(video_url):
+            return
+
+        with self._lock:
+            entry = self._entries.get(video_url)
+            if not entry:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del self._entries[video_url]
+
+        if entry["path"]:
+            try:
+                os.unlink(entry["path"])
+                logger.info(f"Временный файл удалён: {entry['path']}")
+            except FileNotFoundError:
+                pass
+
+
+_artifacts = VideoArtifacts()
+
+
+@contextmanager
+def video_artifact(video_url: str, fetch: bool = True):
+    """
+    Локальный путь к видео для загрузки.
+
+    Вложенные/параллельные вызовы с тем же URL разделяют одну копию;
+    publish_video_task держит внешнюю ссылку (fetch=False) на всё время публикации.
+    """
+    path = _artifacts.acquire(video_url, fetch=fetch)
+    try:
+        yield path
+    finally:
+        _artifacts.release(video_url)
+
 def _post_telegram(video_url: str, caption: str):
     """Публикация в Telegram канал."""
     try:
@@ -49,22 +162,26 @@ def _post_telegram(video_url: str, caption: str):
         
         api = f"https://api.telegram.org/bot{TG_TOKEN}/sendVideo"
         
-        # Пробуем отправить по URL
-        response = requests.post(api, data={
-            "chat_id": TG_CHAT,
-            "caption": caption,
-            "video": video_url,
-            "parse_mode": "HTML"
-        }, timeout=60)
-        
-        if response.status_code == 200:
-            logger.info("✅ Опубликовано в Telegram")
-        else:
-            logger.warning(f"Telegram API вернул статус {response.status_code}, пробую загрузить файл")
+        # Локальный файл Telegram по URL не достанет - сразу загружаем файлом
+        if not VideoArtifacts.resolve_local(video_url):
+            # Пробуем отправить по URL
+            with rate_limiter.guard("telegram"):
+                response = requests.post(api, data={
+                    "chat_id": TG_CHAT,
+                    "caption": caption,
+                    "video": video_url,
+                    "parse_mode": "HTML"
+                }, timeout=60)
             
-            # Скачиваем и загружаем файлом
-            video_file = download_video(video_url)
-            with open(video_file, 'rb') as f:
+            if response.status_code == 200:
+                logger.info("✅ Опубликовано в Telegram")
+                return
+            
+            logger.warning(f"Telegram API вернул статус {response.status_code}, пробую загрузить файл")
+        
+        # Загружаем файлом (общая локальная копия)
+        with video_artifact(video_url) as video_file:
+            with open(video_file, 'rb') as f, rate_limiter.guard("telegram"):
                 response = requests.post(api, 
                     data={"chat_id": TG_CHAT, "caption": caption},
                     files={"video": f},
@@ -73,8 +190,6 @@ def _post_telegram(video_url: str, caption: str):
                 response.raise_for_status()
                 logger.info("✅ Опубликовано в Telegram (через файл)")
             
-            os.unlink(video_file)
-            
     except Exception as e:
         logger.error(f"❌ Ошибка публикации в Telegram: {e}")
         raise
@@ -100,8 +215,9 @@ def _post_instagram_reel(video_url: str, caption: str):
             "access_token": FB_TOKEN
         }
         
-        container_response = requests.post(container_url, data=container_params, timeout=60)
-        container_response.raise_for_status()
+        with rate_limiter.guard("graph"):
+            container_response = requests.post(container_url, data=container_params, timeout=60)
+            container_response.raise_for_status()
         container_id = container_response.json()["id"]
         
         # Шаг 2: Публикация
@@ -111,8 +227,9 @@ def _post_instagram_reel(video_url: str, caption: str):
             "access_token": FB_TOKEN
         }
         
-        publish_response = requests.post(publish_url, data=publish_params, timeout=60)
-        publish_response.raise_for_status()
+        with rate_limiter.guard("graph"):
+            publish_response = requests.post(publish_url, data=publish_params, timeout=60)
+            publish_response.raise_for_status()
         
         logger.info("✅ Опубликовано в Instagram Reels")
         
@@ -127,40 +244,38 @@ def _post_youtube_short(video_url: str, caption: str):
             logger.warning("⚠️ YouTube API не настроен")
             return
         
-        # Скачиваем видео
-        video_file = download_video(video_url)
-        
-        # Создаем credentials из токена
-        creds = Credentials(token=YT_TOKEN)
-        youtube = build('youtube', 'v3', credentials=creds)
+        # Общая локальная копия видео
+        with video_artifact(video_url) as video_file:
+            # Создаем credentials из токена
+            creds = Credentials(token=YT_TOKEN)
+            youtube = build('youtube', 'v3', credentials=creds)
         
-        # Метаданные
-        body = {
-            'snippet': {
-                'title': caption[:100],  # макс 100 символов
-                'description': caption,
-                'tags': ['astrology', 'shorts', 'numerology', 'humandesign'],
-                'categoryId': '22'  # People & Blogs
-            },
-            'status': {
-                'privacyStatus': 'public',
-                'selfDeclaredMadeForKids': False
+            # Метаданные
+            body = {
+                'snippet': {
+                    'title': caption[:100],  # макс 100 символов
+                    'description': caption,
+                    'tags': ['astrology', 'shorts', 'numerology', 'humandesign'],
+                    'categoryId': '22'  # People & Blogs
+                },
+                'status': {
+                    'privacyStatus': 'public',
+                    'selfDeclaredMadeForKids': False
+                }
             }
-        }
-        
-        # Загрузка видео
-        media = MediaFileUpload(video_file, chunksize=-1, resumable=True, mimetype='video/mp4')
         
-        request = youtube.videos().insert(
-            part='snippet,status',
-            body=body,
-            media_body=media
-        )
+            # Загрузка видео
+            media = MediaFileUpload(video_file, chunksize=-1, resumable=True, mimetype='video/mp4')
         
-        response = request.execute()
-        logger.info(f"✅ Опубликовано в YouTube Shorts: {response['id']}")
+            request = youtube.videos().insert(
+                part='snippet,status',
+                body=body,
+                media_body=media
+            )
         
-        os.unlink(video_file)
+            with rate_limiter.guard("youtube"):
+                response = request.execute()
+            logger.info(f"✅ Опубликовано в YouTube Shorts: {response['id']}")
         
     except Exception as e:
         logger.error(f"❌ Ошибка публикации в YouTube: {e}")
@@ -173,43 +288,41 @@ def _post_tiktok(video_url: str, caption: str):
             return
         
         # TikTok Content Posting API
-        video_file = download_video(video_url)
-        
-        # Инициализация загрузки
-        init_url = "https://open.tiktokapis.com/v2/post/publish/video/init/"
-        headers = {
-            "Authorization": f"Bearer {TT_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        
-        init_data = {
-            "post_info": {
-                "title": caption[:150],
-                "privacy_level": "PUBLIC_TO_EVERYONE",
-                "disable_duet": False,
-                "disable_comment": False,
-                "disable_stitch": False,
-                "video_cover_timestamp_ms": 1000
-            },
-            "source_info": {
-                "source": "FILE_UPLOAD",
-                "video_size": os.path.getsize(video_file)
+        with video_artifact(video_url) as video_file:
+            # Инициализация загрузки
+            init_url = "https://open.tiktokapis.com/v2/post/publish/video/init/"
+            headers = {
+                "Authorization": f"Bearer {TT_TOKEN}",
+                "Content-Type": "application/json"
             }
-        }
         
-        init_response = requests.post(init_url, headers=headers, json=init_data, timeout=60)
-        init_response.raise_for_status()
+            init_data = {
+                "post_info": {
+                    "title": caption[:150],
+                    "privacy_level": "PUBLIC_TO_EVERYONE",
+                    "disable_duet": False,
+                    "disable_comment": False,
+                    "disable_stitch": False,
+                    "video_cover_timestamp_ms": 1000
+                },
+                "source_info": {
+                    "source": "FILE_UPLOAD",
+                    "video_size": os.path.getsize(video_file)
+                }
+            }
         
-        upload_url = init_response.json()["data"]["upload_url"]
+            with rate_limiter.guard("tiktok"):
+                init_response = requests.post(init_url, headers=headers, json=init_data, timeout=60)
+                init_response.raise_for_status()
         
-        # Загрузка видео
-        with open(video_file, 'rb') as f:
-            upload_response = requests.put(upload_url, data=f, timeout=300)
-            upload_response.raise_for_status()
+            upload_url = init_response.json()["data"]["upload_url"]
         
-        logger.info("✅ Опубликовано в TikTok")
+            # Загрузка видео
+            with open(video_file, 'rb') as f, rate_limiter.guard("tiktok"):
+                upload_response = requests.put(upload_url, data=f, timeout=300)
+                upload_response.raise_for_status()
         
-        os.unlink(video_file)
+            logger.info("✅ Опубликовано в TikTok")
         
     except Exception as e:
         logger.error(f"❌ Ошибка публикации в TikTok: {e}")
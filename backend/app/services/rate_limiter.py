@@ -0,0 +1,308 @@
+"""
+Per-provider rate limiting and circuit breaking
+
+Every outbound API call (Groq, ElevenLabs, HeyGen, Pollinations, Telegram,
+Graph API, YouTube, TikTok) goes through guard()/async_guard(). State lives
+in Redis so all Celery workers and the API process share one budget:
+
+- Token bucket (atomic Lua script): callers reserve a token and sleep until
+  it is theirs, so a batch drains at the provider's quota instead of firing
+  together and collecting 429s.
+- Circuit breaker: after BREAKER_FAILURE_THRESHOLD consecutive transient
+  failures (429/5xx/connection errors) the provider is opened for
+  BREAKER_COOLDOWN seconds (or Retry-After) and calls fail fast with
+  ProviderUnavailable. One probe call is let through when the cooldown ends.
+
+If Redis is unreachable calls proceed unthrottled.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+import redis
+import requests
+
+from ..config import settings
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Requests per second, burst size
+DEFAULT_LIMITS = {
+    "groq": (0.5, 5),
+    "elevenlabs": (1.0, 3),
+    "heygen": (1.0, 5),
+    "pollinations": (0.5, 2),
+    "telegram": (1.0, 3),
+    "graph": (0.5, 2),
+    "youtube": (0.2, 2),
+    "tiktok": (0.1, 2),
+}
+
+# KEYS[1] bucket; ARGV: rate, burst, max_wait
+# Returns seconds to wait for the reserved token, or -wait if it would exceed max_wait
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+    if wait > max_wait then
+        return tostring(-wait)
+    end
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate + max_wait) + 60)
+return tostring(wait)
+"""
+
+
+class ProviderUnavailable(Exception):
+    """Circuit open or rate limit queue too long for a provider"""
+
+    def __init__(self, provider: str, retry_in: float, reason: str = "circuit open"):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider} unavailable ({reason}), retry in {retry_in:.0f}s")
+
+
+def parse_limits(overrides: str) -> dict:
+    """DEFAULT_LIMITS updated with "name=rate/burst,..." overrides"""
+    limits = dict(DEFAULT_LIMITS)
+    for item in filter(None, (part.strip() for part in overrides.split(","))):
+        try:
+            name, value = item.split("=", 1)
+            rate, _, burst = value.partition("/")
+            limits[name.strip()] = (float(rate), int(burst or 1))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid RATE_LIMITS entry: {item}")
+    return limits
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After") or headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(exc: Exception) -> bool:
+    """Errors that mean the provider is overloaded or down (vs. a bad request)"""
+    if isinstance(exc, ProviderUnavailable):
+        return False
+
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    status = status or getattr(exc, "status_code", None)
+    status = status or getattr(getattr(exc, "resp", None), "status", None)  # googleapiclient HttpError
+    if status is not None:
+        status = int(status)
+        return status == 429 or status >= 500
+
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, TimeoutError, ConnectionError)):
+        return True
+    # groq / httpx connection errors
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout")
+
+
+class RateLimiter:
+    """Redis token buckets and circuit breakers keyed per provider"""
+
+    def __init__(self, redis_url: str, limits: dict):
+        self.limits = limits
+        self._redis = redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+        self._bucket = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def _limit(self, provider: str) -> tuple:
+        if provider not in self.limits:
+            raise ValueError(f"Unknown provider: {provider}")
+        return self.limits[provider]
+
+    # Token bucket
+
+    def reserve(self, provider: str, max_wait: float = None) -> float:
+        """Reserve a token; returns seconds to sleep before calling"""
+        rate, burst = self._limit(provider)
+        max_wait = settings.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+
+        try:
+            wait = float(self._bucket(keys=[f"ratelimit:{provider}"], args=[rate, burst, max_wait]))
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Rate limiter: Redis unavailable ({e}), {provider} not throttled")
+            return 0.0
+
+        if wait < 0:
+            raise ProviderUnavailable(provider, -wait, reason="rate limit queue full")
+        return wait
+
+    # Circuit breaker
+
+    def check_circuit(self, provider: str):
+        """Raise ProviderUnavailable while open; admit a single probe after cooldown"""
+        key = f"breaker:{provider}"
+        try:
+            opened_until = self._redis.hget(key, "opened_until")
+            if opened_until is None:
+                return
+
+            retry_in = float(opened_until) - time.time()
+            if retry_in > 0:
+                raise ProviderUnavailable(provider, retry_in)
+
+            # Half-open: first caller becomes the probe, everyone else waits for its result
+            if not self._redis.set(f"{key}:probe", 1, nx=True, ex=int(settings.BREAKER_COOLDOWN) or 1):
+                raise ProviderUnavailable(provider, settings.BREAKER_COOLDOWN, reason="half-open probe in flight")
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Circuit breaker: Redis unavailable ({e})")
+
+    def record_success(self, provider: str):
+        key = f"breaker:{provider}"
+        try:
+            if self._redis.exists(key):
+                if self._redis.hexists(key, "opened_until"):
+                    logger.info(f"✅ Circuit closed for {provider}")
+                self._redis.delete(key, f"{key}:probe")
+        except redis.RedisError:
+            pass
+
+    def record_failure(self, provider: str, exc: Exception):
+        key = f"breaker:{provider}"
+        try:
+            failures = self._redis.hincrby(key, "failures", 1)
+            self._redis.hset(key, "last_error", str(exc)[:200])
+            half_open = self._redis.delete(f"{key}:probe")
+            retry_after = _retry_after(exc)
+
+            if half_open or retry_after or failures >= settings.BREAKER_FAILURE_THRESHOLD:
+                cooldown = max(retry_after or 0, settings.BREAKER_COOLDOWN)
+                self._redis.hset(key, "opened_until", time.time() + cooldown)
+                logger.warning(f"🔌 Circuit opened for {provider} for {cooldown:.0f}s after {failures} failures: {exc}")
+        except redis.RedisError:
+            pass
+
+    def reset(self, provider: str):
+        self._limit(provider)
+        self._redis.delete(f"breaker:{provider}", f"breaker:{provider}:probe", f"ratelimit:{provider}")
+
+    # Calls
+
+    @contextmanager
+    def guard(self, provider: str, max_wait: float = None):
+        """Wrap one outbound call: circuit check, wait for token, record outcome"""
+        try:
+            self.check_circuit(provider)
+            wait = self.reserve(provider, max_wait)
+        except ProviderUnavailable:
+            telemetry.observe_provider(provider, "rejected", 0.0)
+            raise
+        if wait > 0:
+            logger.debug(f"⏳ {provider}: waiting {wait:.1f}s for rate limit")
+            time.sleep(wait)
+        telemetry.observe_rate_limit_wait(provider, max(wait, 0.0))
+
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if is_transient(e):
+                self.record_failure(provider, e)
+            else:
+                self.record_success(provider)
+            telemetry.observe_provider(provider, "error" if is_transient(e) else "client_error", time.perf_counter() - started)
+            raise
+        else:
+            self.record_success(provider)
+            telemetry.observe_provider(provider, "ok", time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def async_guard(self, provider: str, max_wait: float = None):
+        """guard() for asyncio callers (sleeps without blocking the loop)"""
+        try:
+            self.check_circuit(provider)
+            wait = self.reserve(provider, max_wait)
+        except ProviderUnavailable:
+            telemetry.observe_provider(provider, "rejected", 0.0)
+            raise
+        if wait > 0:
+            await asyncio.sleep(wait)
+        telemetry.observe_rate_limit_wait(provider, max(wait, 0.0))
+
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            if is_transient(e):
+                self.record_failure(provider, e)
+            else:
+                self.record_success(provider)
+            telemetry.observe_provider(provider, "error" if is_transient(e) else "client_error", time.perf_counter() - started)
+            raise
+        else:
+            self.record_success(provider)
+            telemetry.observe_provider(provider, "ok", time.perf_counter() - started)
+
+    # State
+
+    def state(self) -> dict:
+        """Bucket level and breaker state for every provider"""
+        now = time.time()
+        providers = {}
+        for provider, (rate, burst) in self.limits.items():
+            entry = {"rate_per_sec": rate, "burst": burst, "circuit": "closed", "failures": 0}
+            try:
+                bucket = self._redis.hgetall(f"ratelimit:{provider}")
+                breaker = self._redis.hgetall(f"breaker:{provider}")
+            except redis.RedisError as e:
+                entry["error"] = str(e)
+                providers[provider] = entry
+                continue
+
+            if bucket:
+                tokens = float(bucket[b"tokens"]) + max(0.0, now - float(bucket[b"ts"])) * rate
+                entry["tokens"] = round(min(burst, tokens), 2)
+            else:
+                entry["tokens"] = float(burst)
+
+            entry["failures"] = int(breaker.get(b"failures", 0))
+            if b"last_error" in breaker:
+                entry["last_error"] = breaker[b"last_error"].decode("utf-8", errors="replace")
+            if b"opened_until" in breaker:
+                retry_in = float(breaker[b"opened_until"]) - now
+                entry["circuit"] = "open" if retry_in > 0 else "half_open"
+                entry["retry_in"] = round(max(retry_in, 0.0), 1)
+
+            providers[provider] = entry
+        return providers
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(settings.REDIS_URL, parse_limits(settings.RATE_LIMITS))
+    return _limiter
+
+
+def guard(provider: str, max_wait: float = None):
+    """Shortcut: with guard("telegram"): requests.post(...)"""
+    return get_rate_limiter().guard(provider, max_wait)
+
+
+def async_guard(provider: str, max_wait: float = None):
+    return get_rate_limiter().async_guard(provider, max_wait)
@@ -0,0 +1,153 @@
+"""
+Warm render process pool
+
+Compositing and encoding run in a long-lived pool of renderer processes
+instead of inside each Celery task. Every pool process resolves ffmpeg and
+fills the subtitle glyph atlas once at start-up (and imports MoviePy when
+that renderer is selected). Backgrounds are normalized once by the
+dispatching process (background_cache) and memory-mapped by the renderers,
+so the decoded frame is shared through the page cache without copying.
+
+The Celery render worker runs with a thread pool (see run_worker.sh): each
+task thread submits a job here and waits for the result. Under a prefork
+Celery pool the children are daemonic and cannot start processes, so jobs
+render inline as before.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+from .background_cache import get_background_cache
+from .stage_timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up():
+    """Pool initializer: pay every one-time cost before the first job"""
+    from . import compositor, text_render
+
+    ffmpeg = compositor.find_ffmpeg()
+    text_render.warm_up(compositor.load_font(50))
+
+    if settings.VIDEO_RENDERER == "moviepy":
+        from moviepy import VideoClip  # noqa: F401
+
+    logger.info(f"🔥 Renderer {os.getpid()} warm (ffmpeg: {ffmpeg})")
+
+
+def _render_job(
+    text: str,
+    background_path: str,
+    audio_path: str,
+    text_position: str,
+    encoding_profile: Optional[str]
+):
+    from .video_generator import create_video
+
+    timer = StageTimer()
+    video_path, audio_path = create_video(
+        text=text,
+        background_path=Path(background_path),
+        audio_path=Path(audio_path),
+        text_position=text_position,
+        encoding_profile=encoding_profile,
+        timer=timer
+    )
+    return str(video_path), str(audio_path), timer.spans
+
+
+class RenderPool:
+    """Process pool of warm renderers, created lazily per dispatching process"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        # Daemonic processes (Celery prefork children) cannot have children
+        return settings.RENDER_POOL and not multiprocessing.current_process().daemon
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up
+                )
+                logger.info(f"🏭 Render pool started with {self.size} processes")
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def render(
+        self,
+        text: str,
+        background_path: Path,
+        audio_path: Path,
+        text_position: str = "center",
+        encoding_profile: Optional[str] = None,
+        timer: Optional[StageTimer] = None
+    ) -> tuple[Path, Path]:
+        """Render in a pool process and wait for it; same result as create_video"""
+        # Normalize once here; renderers only memory-map the prepared frame
+        get_background_cache().prepare(background_path)
+
+        future = self._get_executor().submit(
+            _render_job, text, str(background_path), str(audio_path), text_position, encoding_profile
+        )
+        try:
+            video_path, audio_path, spans = future.result()
+        except BrokenProcessPool:
+            # A renderer died (OOM, segfault) - next job gets a fresh pool
+            logger.error("❌ Render pool broken, restarting")
+            self._reset()
+            raise
+        if timer is not None:
+            timer.extend(spans)
+        return Path(video_path), Path(audio_path)
+
+    def shutdown(self):
+        self._reset()
+
+
+_pool: Optional[RenderPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool(settings.RENDER_POOL_SIZE or os.cpu_count() or 1)
+        return _pool
+
+
+def render(
+    text: str,
+    background_path: Path,
+    audio_path: Path,
+    text_position: str = "center",
+    encoding_profile: Optional[str] = None,
+    timer: Optional[StageTimer] = None
+) -> tuple[Path, Path]:
+    """Render through the warm pool when possible, otherwise inline"""
+    if RenderPool.available():
+        return get_render_pool().render(text, background_path, audio_path, text_position, encoding_profile, timer)
+
+    from .video_generator import create_video
+    return create_video(text, background_path, audio_path, text_position, encoding_profile=encoding_profile, timer=timer)
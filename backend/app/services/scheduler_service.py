@@ -1,7 +1,7 @@
 """Automatic scheduling service"""
 import logging
 from datetime import datetime, timedelta, time as dt_time
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from .. import models
 from ..models_extended import ScheduledPost, AutomationLog
 
@@ -99,19 +99,54 @@ def create_daily_schedule(db: Session):
         raise
 
 
-def get_pending_posts(db: Session) -> list[ScheduledPost]:
+# Запросы горячих путей автоматизации. Их используют задачи и роутер, а
+# benchmarks/query_plans.py проверяет их планы - индексы в models_extended.
+
+def pending_posts_query(db: Session, lead_minutes: int = 0) -> Query:
+    """Pending посты, у которых scheduled_time <= now + lead_minutes, по времени"""
+    horizon = datetime.now() + timedelta(minutes=lead_minutes)
+    return db.query(ScheduledPost).filter(
+        ScheduledPost.scheduled_time <= horizon,
+        ScheduledPost.status == "pending"
+    ).order_by(ScheduledPost.scheduled_time)
+
+
+def pending_count_query(db: Session) -> Query:
+    return db.query(ScheduledPost).filter(ScheduledPost.status == "pending")
+
+
+def published_today_query(db: Session) -> Query:
+    today_start = datetime.now().replace(hour=0, minute=0, second=0)
+    return db.query(ScheduledPost).filter(
+        ScheduledPost.published_at >= today_start,
+        ScheduledPost.status == "published"
+    )
+
+
+def unnotified_errors_query(db: Session, limit: int = 10) -> Query:
+    """Неотправленные ошибки, старые первыми"""
+    return db.query(AutomationLog).filter(
+        AutomationLog.level == "ERROR",
+        AutomationLog.notified == False  # noqa: E712
+    ).order_by(AutomationLog.created_at).limit(limit)
+
+
+def automation_logs_query(db: Session, level: str = None, limit: int = 50) -> Query:
+    """Последние логи, опционально по уровню"""
+    query = db.query(AutomationLog)
+    if level:
+        query = query.filter(AutomationLog.level == level)
+    return query.order_by(AutomationLog.created_at.desc()).limit(limit)
+
+
+def get_pending_posts(db: Session, lead_minutes: int = 0) -> list[ScheduledPost]:
     """
     Получить посты, готовые к обработке
     Выбирает посты где:
-    - scheduled_time <= now
+    - scheduled_time <= now + lead_minutes (пайплайн стартует заранее)
     - status = "pending"
     """
-    now = datetime.now()
-    
-    return db.query(ScheduledPost).filter(
-        ScheduledPost.scheduled_time <= now,
-        ScheduledPost.status == "pending"
-    ).order_by(ScheduledPost.scheduled_time).all()
+    return pending_posts_query(db, lead_minutes).all()
 
 
 def log_automation_error(db: Session, message: str, details: str = None):
@@ -0,0 +1,88 @@
+"""
+Render pipeline stage timings
+
+A StageTimer collects (stage, seconds, status) spans while a video is made.
+It is passed down explicitly, like progress_callback, and is picklable so
+the render pool process can time its stages and hand them back with the
+result. The Celery task stores the spans as VideoStageTiming rows (for
+/api/metrics/stages) and records them in the video_stage_duration_seconds
+histogram served by /metrics.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+STAGES = [
+    "background",
+    "tts",
+    "audio_probe",
+    "subtitles",
+    "composite",
+    "encode",
+    "db_commit",
+    "telegram",
+]
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300]
+
+
+class StageTimer:
+    """Ordered list of timed spans for one render"""
+
+    def __init__(self):
+        self.spans: list[tuple[str, float, str]] = []
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.spans.append((stage, time.perf_counter() - started, status))
+
+    def extend(self, spans: list):
+        self.spans.extend(tuple(span) for span in spans)
+
+    def summary(self) -> str:
+        return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds, _ in self.spans)
+
+    def save(self, db, video_id: int, task_id: Optional[str] = None, encoding_profile: Optional[str] = None):
+        """Add the spans as VideoStageTiming rows (caller commits) and record them in Prometheus"""
+        from .. import models
+        from . import telemetry
+
+        db.add_all(
+            models.VideoStageTiming(
+                video_id=video_id,
+                task_id=task_id,
+                stage=stage,
+                duration=seconds,
+                encoding_profile=encoding_profile,
+                status=status
+            )
+            for stage, seconds, status in self.spans
+        )
+        for stage, seconds, status in self.spans:
+            telemetry.observe_stage(stage, encoding_profile or "unknown", seconds, status)
+        logger.info(f"⏱️ Video {video_id} stages: {self.summary()}")
+
+
+class NullTimer(StageTimer):
+    """Timer that records nothing, for callers that don't collect spans"""
+
+    @contextmanager
+    def span(self, stage: str):
+        yield
+
+
+def timer_or_null(timer: Optional[StageTimer]) -> StageTimer:
+    return timer if timer is not None else NullTimer()
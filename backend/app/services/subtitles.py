@@ -0,0 +1,187 @@
+"""
+Subtitle timing
+
+Word timings come from, in order of preference:
+1. ElevenLabs character alignment (with-timestamps endpoint)
+2. A local energy-based segmenter: speech regions are found in the decoded
+   audio and words are spread over voiced time only, so pauses stay empty
+3. An even split over the audio duration
+
+Word timings are stored in a `.cues.json` sidecar next to the TTS audio (and
+its cache entry), so a rerender with another background or text position
+reuses them without new synthesis or analysis.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02  # 20 ms analysis frames
+MIN_PAUSE_SECONDS = 0.15  # shorter silences are not pauses
+
+Word = tuple[float, float, str]
+Cue = tuple[float, float, str]
+
+
+def sidecar_path(audio_path: Path) -> Path:
+    return audio_path.with_suffix(".cues.json")
+
+
+def load_words(path: Path, text: str) -> Optional[list[Word]]:
+    """Cached word timings for text, or None"""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("text") != text:
+        return None
+    return [tuple(word) for word in data["words"]]
+
+
+def save_words(path: Path, text: str, words: list[Word], source: str):
+    # Unique per writer: concurrent renders of the same text save the same cues
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(
+        json.dumps({"text": text, "source": source, "words": words}, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    tmp_path.replace(path)
+
+
+def words_from_alignment(alignment: dict) -> list[Word]:
+    """Group aligned characters into (start, end, word)"""
+    words = []
+    current, start, end = "", None, None
+    for char, char_start, char_end in zip(alignment["characters"], alignment["starts"], alignment["ends"]):
+        if char.isspace():
+            if current:
+                words.append((start, end, current))
+            current, start = "", None
+            continue
+        if start is None:
+            start = char_start
+        current += char
+        end = char_end
+    if current:
+        words.append((start, end, current))
+    return words
+
+
+def _speech_regions(audio_path: Path) -> tuple[list[tuple[float, float]], float]:
+    """Voiced (start, end) regions and total duration from RMS energy"""
+    from .compositor import find_ffmpeg
+
+    result = subprocess.run(
+        [find_ffmpeg(), "-v", "error", "-i", str(audio_path),
+         "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+        capture_output=True,
+        check=True
+    )
+    samples = np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32)
+    duration = len(samples) / SAMPLE_RATE
+
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return [], duration
+
+    rms = np.sqrt(np.mean(samples[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    threshold = max(np.percentile(rms, 95) * 0.1, 1.0)
+    voiced = rms > threshold
+
+    # Frames -> regions, bridging pauses shorter than MIN_PAUSE_SECONDS
+    regions = []
+    max_gap = int(MIN_PAUSE_SECONDS / FRAME_SECONDS)
+    start = None
+    last_voiced = None
+    for i, is_voiced in enumerate(voiced):
+        if not is_voiced:
+            continue
+        if start is None:
+            start = i
+        elif i - last_voiced > max_gap:
+            regions.append((start * FRAME_SECONDS, (last_voiced + 1) * FRAME_SECONDS))
+            start = i
+        last_voiced = i
+    if start is not None:
+        regions.append((start * FRAME_SECONDS, (last_voiced + 1) * FRAME_SECONDS))
+
+    return regions, duration
+
+
+def words_from_energy(text: str, audio_path: Path) -> list[Word]:
+    """Spread words over voiced time in proportion to their length"""
+    words = text.split()
+    regions, duration = _speech_regions(audio_path)
+    if not words:
+        return []
+    if not regions:
+        return words_evenly(text, duration)
+
+    voiced_total = sum(end - start for start, end in regions)
+    weights = np.array([len(word) + 1 for word in words], dtype=np.float64)
+    bounds = np.concatenate([[0.0], np.cumsum(weights) / weights.sum() * voiced_total])
+
+    # Voiced-time offset -> absolute time
+    region_starts = np.array([start for start, _ in regions])
+    region_offsets = np.concatenate([[0.0], np.cumsum([end - start for start, end in regions])])
+
+    def to_time(offset: float) -> float:
+        index = min(np.searchsorted(region_offsets, offset, side="right") - 1, len(regions) - 1)
+        return float(region_starts[index] + offset - region_offsets[index])
+
+    return [
+        (to_time(bounds[i]), to_time(bounds[i + 1]), word)
+        for i, word in enumerate(words)
+    ]
+
+
+def words_evenly(text: str, duration: float) -> list[Word]:
+    words = text.split()
+    if not words:
+        return []
+    step = duration / len(words)
+    return [(i * step, (i + 1) * step, word) for i, word in enumerate(words)]
+
+
+def words_to_cues(words: list[Word], duration: float, words_per_line: int = 3) -> list[Cue]:
+    """
+    Group words into lines; each line stays until the next one starts
+
+    The first line appears at 0 and the last one lasts to the end of the audio,
+    so there is no flicker between lines.
+    """
+    lines = [words[i:i + words_per_line] for i in range(0, len(words), words_per_line)]
+    cues = []
+    for i, line in enumerate(lines):
+        start = 0.0 if i == 0 else line[0][0]
+        end = lines[i + 1][0][0] if i + 1 < len(lines) else max(duration, line[-1][1])
+        cues.append((start, end, " ".join(word for _, _, word in line)))
+    return cues
+
+
+def get_cues(text: str, audio_path: Path, duration: float, words_per_line: int = 3) -> list[Cue]:
+    """Subtitle cues for audio_path, from the sidecar or the energy segmenter"""
+    path = sidecar_path(audio_path)
+    words = load_words(path, text)
+    if words is not None:
+        logger.info(f"♻️ Subtitle timings from {path.name}")
+    else:
+        try:
+            words = words_from_energy(text, audio_path)
+            save_words(path, text, words, source="energy")
+            logger.info("✅ Subtitle timings from energy segmenter")
+        except Exception as e:
+            logger.warning(f"⚠️ Energy segmenter failed ({e}), splitting evenly")
+            words = words_evenly(text, duration)
+
+    return words_to_cues(words, duration, words_per_line)
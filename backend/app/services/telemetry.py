@@ -0,0 +1,208 @@
+"""
+Prometheus metrics
+
+One multiprocess-safe registry for the API, every Celery worker (prefork
+children and threads) and the render pool processes: each process writes its
+samples to PROMETHEUS_MULTIPROC_DIR and /metrics merges the files at scrape
+time. The directory has to be shared by the processes of one host and emptied
+when they all restart (start.sh does this).
+
+Metrics:
+    http_request_duration_seconds      API latency per router / method / status
+    celery_task_duration_seconds       task run time per task / state
+    celery_tasks_total                 finished tasks per task / state
+    celery_queue_depth                 messages waiting per queue (read from Redis at scrape)
+    provider_request_duration_seconds  outbound provider calls per provider / outcome
+    provider_rate_limit_wait_seconds   time spent waiting for a rate limit token
+    cache_requests_total               cache lookups per cache / result (hit ratio = hit / all)
+    video_stage_duration_seconds       render pipeline stage time per stage / profile
+    video_stage_errors_total           render pipeline stages that raised
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+
+from ..config import settings
+from .stage_timing import BUCKETS as STAGE_BUCKETS
+
+# Must be set before prometheus_client creates its first metric; inherited by
+# render pool processes
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.PROMETHEUS_MULTIPROC_DIR)
+Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mkdir(parents=True, exist_ok=True)
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess  # noqa: E402
+from prometheus_client.core import GaugeMetricFamily  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Path prefix -> router label
+ROUTERS = {
+    "/api/scripts": "scripts",
+    "/api/videos": "videos",
+    "/api/generate": "generate",
+    "/api/publish": "publish",
+    "/api/automation": "automation",
+    "/api/auth": "auth",
+    "/api/upload": "upload",
+    "/api/tasks": "tasks",
+    "/api/settings": "settings",
+    "/api/providers": "providers",
+    "/api/metrics": "metrics",
+    "/storage": "storage",
+}
+
+QUEUES = ["celery", "llm", "render", "publish", "automation"]
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency",
+    ["router", "method", "status"],
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=[0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600],
+)
+
+CELERY_TASKS = Counter(
+    "celery_tasks",
+    "Finished Celery tasks",
+    ["task", "state"],
+)
+
+PROVIDER_REQUEST_DURATION = Histogram(
+    "provider_request_duration_seconds",
+    "External provider call latency",
+    ["provider", "outcome"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120],
+)
+
+PROVIDER_RATE_LIMIT_WAIT = Histogram(
+    "provider_rate_limit_wait_seconds",
+    "Time spent waiting for a provider rate limit token",
+    ["provider"],
+    buckets=[0, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups",
+    ["cache", "result"],
+)
+
+VIDEO_STAGE_DURATION = Histogram(
+    "video_stage_duration_seconds",
+    "Duration of video render pipeline stages",
+    ["stage", "profile"],
+    buckets=STAGE_BUCKETS,
+)
+
+VIDEO_STAGE_ERRORS = Counter(
+    "video_stage_errors",
+    "Video render pipeline stages that raised",
+    ["stage", "profile"],
+)
+
+
+def router_label(path: str) -> str:
+    for prefix, label in ROUTERS.items():
+        if path.startswith(prefix):
+            return label
+    return "other"
+
+
+def observe_request(path: str, method: str, status: int, seconds: float):
+    HTTP_REQUEST_DURATION.labels(router_label(path), method, str(status)).observe(seconds)
+
+
+def observe_provider(provider: str, outcome: str, seconds: float):
+    """outcome: ok, error (transient, counts toward the breaker), client_error, rejected"""
+    PROVIDER_REQUEST_DURATION.labels(provider, outcome).observe(seconds)
+
+
+def observe_rate_limit_wait(provider: str, seconds: float):
+    PROVIDER_RATE_LIMIT_WAIT.labels(provider).observe(seconds)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_stage(stage: str, profile: str, seconds: float, status: str):
+    VIDEO_STAGE_DURATION.labels(stage, profile).observe(seconds)
+    if status == "error":
+        VIDEO_STAGE_ERRORS.labels(stage, profile).inc()
+
+
+class QueueDepthCollector:
+    """celery_queue_depth read from the Redis broker when scraped"""
+
+    def collect(self):
+        import redis
+
+        gauge = GaugeMetricFamily("celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+        try:
+            client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+            with client.pipeline() as pipe:
+                for queue in QUEUES:
+                    pipe.llen(queue)
+                depths = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Queue depth unavailable: {e}")
+            return
+        for queue, depth in zip(QUEUES, depths):
+            gauge.add_metric([queue], depth)
+        yield gauge
+
+
+def _scrape_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(QueueDepthCollector())
+    return registry
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Merged samples of all processes plus live queue depths"""
+    return generate_latest(_scrape_registry()), CONTENT_TYPE_LATEST
+
+
+# Celery
+
+_task_started: dict = {}
+
+
+def connect_celery_signals():
+    """Task duration / outcome metrics from Celery signals"""
+    from celery.signals import task_postrun, task_prerun
+
+    @task_prerun.connect(weak=False)
+    def on_task_prerun(task_id=None, **kwargs):
+        _task_started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+        started = _task_started.pop(task_id, None)
+        name = task.name if task else "unknown"
+        state = state or "UNKNOWN"
+        CELERY_TASKS.labels(name, state).inc()
+        if started is not None:
+            CELERY_TASK_DURATION.labels(name, state).observe(time.perf_counter() - started)
+
+
+def start_worker_server():
+    """Serve /metrics from a worker host that runs without the API (WORKER_METRICS_PORT)"""
+    from prometheus_client import start_http_server
+
+    try:
+        start_http_server(settings.WORKER_METRICS_PORT, registry=_scrape_registry())
+    except OSError as e:
+        # Another worker on this host already serves the shared directory
+        logger.info(f"Worker metrics port {settings.WORKER_METRICS_PORT} busy ({e}), not starting")
+        return
+    logger.info(f"📈 Worker metrics on :{settings.WORKER_METRICS_PORT}/metrics")
@@ -0,0 +1,257 @@
+"""
+Subtitle text rendering with a glyph atlas and a card cache
+
+Each (font, size, stroke) gets an atlas of glyphs rasterized once as a pair of
+coverage masks: the stroked outline and the fill. A subtitle card is laid out
+by placing atlas glyphs at their advance positions and combining the masks the
+same way ImageDraw.text(..., stroke_width=...) does (stroke pass first, fill
+pass over it), so cards match the direct Pillow output.
+
+Finished cards are kept in a byte-bounded LRU keyed on
+(text, font, size, stroke, width). Renderer processes are long-lived, so
+repeated hooks and phrases cost a dictionary lookup after the first video.
+"""
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from ..config import settings
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_CHARSET = (
+    "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+    "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+    "abcdefghijklmnopqrstuvwxyz"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "0123456789.,!?:;-—–«»\"'()%+…"
+)
+
+
+def font_id(font: ImageFont.FreeTypeFont) -> str:
+    """Identity of a loaded font for cache keys"""
+    return getattr(font, "path", None) or f"default:{id(font)}"
+
+
+class GlyphAtlas:
+    """Stroke and fill masks per character for one font, size and stroke width"""
+
+    def __init__(self, font: ImageFont.FreeTypeFont, stroke_width: int):
+        self.font = font
+        self.stroke_width = stroke_width
+        ascent, descent = font.getmetrics()
+        self.line_height = ascent + descent + 2 * stroke_width
+        # Room for negative bearings and the stroke on both sides
+        self.pad = stroke_width + max(4, font.size // 8)
+        self._glyphs: dict = {}
+        self._lock = threading.Lock()
+
+    def glyph(self, char: str) -> tuple[np.ndarray, np.ndarray]:
+        """(stroke_mask, fill_mask) uint8 arrays, origin at (pad, 0)"""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self._rasterize(char)
+            with self._lock:
+                self._glyphs[char] = glyph
+        return glyph
+
+    def _rasterize(self, char: str) -> tuple[np.ndarray, np.ndarray]:
+        width = math.ceil(self.font.getlength(char)) + 2 * self.pad
+        origin = (self.pad, self.stroke_width)
+
+        stroke = Image.new("L", (width, self.line_height), 0)
+        ImageDraw.Draw(stroke).text(origin, char, font=self.font, fill=255, stroke_width=self.stroke_width, stroke_fill=255)
+
+        fill = Image.new("L", (width, self.line_height), 0)
+        ImageDraw.Draw(fill).text(origin, char, font=self.font, fill=255)
+
+        return np.asarray(stroke), np.asarray(fill)
+
+    def warm(self, chars: Iterable[str]):
+        for char in set(chars):
+            if not char.isspace():
+                self.glyph(char)
+
+    def __len__(self) -> int:
+        return len(self._glyphs)
+
+
+class CardCache:
+    """Byte-bounded LRU of rendered RGBA subtitle cards"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._cards: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            card = self._cards.get(key)
+            if card is None:
+                self.misses += 1
+            else:
+                self._cards.move_to_end(key)
+                self.hits += 1
+        telemetry.record_cache("text_card", card is not None)
+        return card
+
+    def put(self, key: tuple, card: np.ndarray):
+        if card.nbytes > self.max_bytes:
+            return
+        card.setflags(write=False)
+        with self._lock:
+            if key in self._cards:
+                return
+            self._cards[key] = card
+            self._bytes += card.nbytes
+            while self._bytes > self.max_bytes:
+                _, old = self._cards.popitem(last=False)
+                self._bytes -= old.nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cards),
+                "size_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_atlases: dict = {}
+_atlases_lock = threading.Lock()
+_card_cache: Optional[CardCache] = None
+
+
+def get_atlas(font: ImageFont.FreeTypeFont, stroke_width: int) -> GlyphAtlas:
+    key = (font_id(font), font.size, stroke_width)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        with _atlases_lock:
+            atlas = _atlases.setdefault(key, GlyphAtlas(font, stroke_width))
+    return atlas
+
+
+def get_card_cache() -> CardCache:
+    global _card_cache
+    if _card_cache is None:
+        _card_cache = CardCache(settings.TEXT_CARD_CACHE_MB * 1024 * 1024)
+    return _card_cache
+
+
+def _break_word(word: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
+    """Split a word wider than max_width (links, hashtag chains) into fitting pieces"""
+    pieces = []
+    current = ""
+    for char in word:
+        if current and font.getlength(current + char) > max_width:
+            pieces.append(current)
+            current = char
+        else:
+            current += char
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
+    """Greedy word wrap, like MoviePy's method='caption', hard-breaking over-wide words"""
+    lines = []
+    current = ""
+    for word in text.split():
+        pieces = _break_word(word, font, max_width) if font.getlength(word) > max_width else [word]
+        for piece in pieces:
+            candidate = f"{current} {piece}".strip()
+            if current and font.getlength(candidate) > max_width:
+                lines.append(current)
+                current = piece
+            else:
+                current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _compose_card(text: str, atlas: GlyphAtlas, width: int) -> np.ndarray:
+    font = atlas.font
+    pad = atlas.pad
+    lines = wrap_text(text, font, width - 2 * atlas.stroke_width)
+    line_height = atlas.line_height
+    height = max(line_height * len(lines), line_height)
+
+    # Canvas wider than the card so glyph padding never needs clipping
+    stroke = np.zeros((height, width + 2 * pad), dtype=np.uint8)
+    fill = np.zeros_like(stroke)
+
+    for i, line in enumerate(lines):
+        line_x = (width - font.getlength(line)) / 2
+        top = i * line_height
+        for j, char in enumerate(line):
+            if char.isspace():
+                continue
+            glyph_stroke, glyph_fill = atlas.glyph(char)
+            # Advance of the prefix keeps the font's kerning
+            x = max(round(line_x + font.getlength(line[:j])), 0)
+            if x >= stroke.shape[1]:
+                break
+            x1 = min(x + glyph_stroke.shape[1], stroke.shape[1])
+            region = (slice(top, top + line_height), slice(x, x1))
+            np.maximum(stroke[region], glyph_stroke[:, :x1 - x], out=stroke[region])
+            np.maximum(fill[region], glyph_fill[:, :x1 - x], out=fill[region])
+
+    stroke = stroke[:, pad:pad + width].astype(np.uint16)
+    fill = fill[:, pad:pad + width].astype(np.uint16)
+
+    # Black stroke pass, then white fill pass blended over it
+    card = np.empty((height, width, 4), dtype=np.uint8)
+    card[..., :3] = fill[..., None]
+    card[..., 3] = fill + (stroke * (255 - fill) + 127) // 255
+    return card
+
+
+def render_card(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    width: int = 980,
+    stroke_width: int = 3
+) -> np.ndarray:
+    """
+    Cached white-on-black-stroke subtitle card
+
+    Returns:
+        Read-only RGBA uint8 array of shape (height, width, 4)
+    """
+    key = (text, font_id(font), font.size, stroke_width, width)
+    cache = get_card_cache()
+    card = cache.get(key)
+    if card is None:
+        card = _compose_card(text, get_atlas(font, stroke_width), width)
+        cache.put(key, card)
+    return card
+
+
+def warm_up(
+    font: ImageFont.FreeTypeFont,
+    stroke_width: int = 3,
+    width: int = 980,
+    phrases: Iterable[str] = ()
+):
+    """Rasterize the common charset and pre-render known phrases"""
+    atlas = get_atlas(font, stroke_width)
+    atlas.warm(WARM_UP_CHARSET)
+    for phrase in phrases:
+        render_card(phrase, font, width, stroke_width)
+    logger.info(f"🔤 Glyph atlas warm: {len(atlas)} glyphs, {get_card_cache().stats()['entries']} cards")
@@ -0,0 +1,185 @@
+"""
+Content-addressed cache for synthesized speech
+
+Entries are keyed by a SHA-256 digest of everything that affects the audio
+(text, voice, model, voice settings) and live under STORAGE_ROOT/audio/tts_cache.
+A JSON index tracks sizes and last access for LRU eviction plus hit/miss counters.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Persistent, size-bounded LRU cache of TTS audio files"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+        self.lock_path = self.root / "index.lock"
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, model_id: str, voice_settings: dict) -> str:
+        """Stable digest of all synthesis parameters"""
+        payload = json.dumps(
+            {
+                "text": text,
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "voice_settings": voice_settings,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _locked_index(self):
+        """Load index under an exclusive file lock (shared by all workers)"""
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                index = {"entries": {}, "hits": 0, "misses": 0}
+                if self.index_path.exists():
+                    try:
+                        index = json.loads(self.index_path.read_text())
+                    except ValueError:
+                        logger.warning("⚠️ TTS cache index corrupted, starting fresh")
+
+                yield index
+
+                tmp_path = self.index_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps(index))
+                os.replace(tmp_path, self.index_path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def path_for(self, key: str, suffix: str = ".mp3") -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def cues_path(self, key: str) -> Path:
+        """Subtitle word timings stored alongside the audio"""
+        return self.path_for(key, ".cues.json")
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return cached audio path or None, recording hit/miss"""
+        with self._locked_index() as index:
+            entry = index["entries"].get(key)
+            path = self.root / entry["file"] if entry else None
+
+            if path is None or not path.exists():
+                index["entries"].pop(key, None)
+                index["misses"] += 1
+                telemetry.record_cache("tts", False)
+                return None
+
+            entry["last_access"] = time.time()
+            index["hits"] += 1
+            telemetry.record_cache("tts", True)
+            return path
+
+    def put(self, key: str, source: Path, suffix: str = ".mp3") -> Path:
+        """Move a freshly synthesized file into the cache"""
+        target = self.path_for(key, suffix)
+        os.replace(source, target)
+
+        with self._locked_index() as index:
+            now = time.time()
+            index["entries"][key] = {
+                "file": target.name,
+                "size": target.stat().st_size,
+                "created_at": now,
+                "last_access": now,
+            }
+            self._evict(index, keep=key)
+
+        return target
+
+    def _evict(self, index: dict, keep: str = None):
+        """Drop least recently used entries until under max_bytes"""
+        entries = index["entries"]
+        total = sum(entry["size"] for entry in entries.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                (self.root / entry["file"]).unlink()
+            except FileNotFoundError:
+                pass
+            self.cues_path(key).unlink(missing_ok=True)
+            total -= entry["size"]
+            del entries[key]
+            logger.info(f"🧹 Evicted TTS cache entry {key[:12]}")
+
+    @staticmethod
+    def materialize(cached: Path, dest: Path, optional: bool = False) -> Path:
+        """
+        Expose a cached file at dest without duplicating data.
+
+        Hard link when possible so deleting a video's audio never removes
+        the cache entry; falls back to a copy across filesystems.
+        optional=True skips silently when cached does not exist.
+        """
+        if dest.exists() or (optional and not cached.exists()):
+            return dest
+        try:
+            os.link(cached, dest)
+        except FileExistsError:
+            # Another job materialized the same audio concurrently
+            pass
+        except OSError:
+            tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+            shutil.copyfile(cached, tmp)
+            os.replace(tmp, dest)
+        return dest
+
+    def stats(self) -> dict:
+        with self._locked_index() as index:
+            lookups = index["hits"] + index["misses"]
+            return {
+                "entries": len(index["entries"]),
+                "size_bytes": sum(entry["size"] for entry in index["entries"].values()),
+                "max_bytes": self.max_bytes,
+                "hits": index["hits"],
+                "misses": index["misses"],
+                "hit_ratio": index["hits"] / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Process-wide cache under STORAGE_ROOT/audio"""
+    global _cache
+    if _cache is None:
+        from .. import storage as storage_module
+
+        if not storage_module.AUDIO_DIR:
+            storage_module.init_storage()
+
+        _cache = TTSCache(
+            storage_module.AUDIO_DIR / "tts_cache",
+            max_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _cache
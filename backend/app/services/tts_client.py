@@ -0,0 +1,193 @@
+"""
+Streaming ElevenLabs client
+
+Uses one keep-alive HTTP session per process and the /stream endpoint so
+audio is written to disk chunk by chunk as it is synthesized. Memory stays
+flat regardless of script length.
+
+stream_speech_with_timestamps() uses /stream/with-timestamps, which also
+returns per-character timing used for subtitle alignment.
+"""
+
+import base64
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import settings
+from . import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
+CHUNK_SIZE = 16 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide keep-alive session.
+
+    Created lazily so every Celery prefork child gets its own connection pool
+    instead of sharing sockets inherited across fork.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.HTTP_POOL_SIZE
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def stream_speech(
+    text: str,
+    voice_id: str,
+    api_key: str,
+    dest: Path,
+    model_id: str,
+    voice_settings: dict,
+    timeout: float = 60
+) -> Path:
+    """
+    Synthesize speech and stream it straight to dest
+
+    Args:
+        text: Text to speak
+        voice_id: ElevenLabs voice ID
+        api_key: ElevenLabs API key
+        dest: File to write (created/truncated)
+        model_id: ElevenLabs model
+        voice_settings: Voice settings payload
+        timeout: Connect/read timeout in seconds
+
+    Returns:
+        dest
+
+    Raises:
+        requests.HTTPError: If API call fails
+    """
+    url = f"{ELEVENLABS_API_URL}/text-to-speech/{voice_id}/stream"
+
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": api_key
+    }
+
+    data = {
+        "text": text,
+        "model_id": model_id,
+        "voice_settings": voice_settings
+    }
+
+    with rate_limiter.guard("elevenlabs"), \
+            get_session().post(url, json=data, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            error_msg = f"ElevenLabs API error: {response.status_code} - {response.text}"
+            logger.error(f"❌ {error_msg}")
+            raise requests.HTTPError(error_msg, response=response)
+
+        bytes_written = 0
+        with open(dest, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                bytes_written += len(chunk)
+
+    if bytes_written == 0:
+        raise requests.HTTPError("ElevenLabs returned empty audio stream")
+
+    return dest
+
+
+def stream_speech_with_timestamps(
+    text: str,
+    voice_id: str,
+    api_key: str,
+    dest: Path,
+    model_id: str,
+    voice_settings: dict,
+    timeout: float = 60
+) -> dict:
+    """
+    Like stream_speech, but also collects character alignment
+
+    The response is newline-delimited JSON; each line carries a base64 audio
+    chunk and the alignment of the characters spoken in it.
+
+    Returns:
+        {"characters": [...], "starts": [...], "ends": [...]} in seconds
+    """
+    url = f"{ELEVENLABS_API_URL}/text-to-speech/{voice_id}/stream/with-timestamps"
+
+    headers = {
+        "Content-Type": "application/json",
+        "xi-api-key": api_key
+    }
+
+    data = {
+        "text": text,
+        "model_id": model_id,
+        "voice_settings": voice_settings
+    }
+
+    alignment = {"characters": [], "starts": [], "ends": []}
+
+    with rate_limiter.guard("elevenlabs"), \
+            get_session().post(url, json=data, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            error_msg = f"ElevenLabs API error: {response.status_code} - {response.text}"
+            logger.error(f"❌ {error_msg}")
+            raise requests.HTTPError(error_msg, response=response)
+
+        bytes_written = 0
+        with open(dest, "wb") as f:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+
+                audio = message.get("audio_base64")
+                if audio:
+                    chunk = base64.b64decode(audio)
+                    f.write(chunk)
+                    bytes_written += len(chunk)
+
+                chunk_alignment = message.get("alignment")
+                if chunk_alignment:
+                    _append_alignment(alignment, chunk_alignment)
+
+    if bytes_written == 0:
+        raise requests.HTTPError("ElevenLabs returned empty audio stream")
+
+    return alignment
+
+
+def _append_alignment(alignment: dict, chunk: dict):
+    """Merge one chunk's alignment, shifting it if its times restart at zero"""
+    starts = chunk.get("character_start_times_seconds") or []
+    ends = chunk.get("character_end_times_seconds") or []
+    characters = chunk.get("characters") or []
+
+    offset = 0.0
+    if alignment["ends"] and starts and starts[0] + 0.05 < alignment["ends"][-1]:
+        offset = alignment["ends"][-1]
+
+    alignment["characters"].extend(characters)
+    alignment["starts"].extend(start + offset for start in starts)
+    alignment["ends"].extend(end + offset for end in ends)
@@ -6,7 +6,16 @@ No HeyGen, no auto-detection, no defaults
 import logging
 from pathlib import Path
 import tempfile
-import requests
+import uuid
+
+import numpy as np
+
+from ..config import settings
+from . import subtitles, tts_client
+from .tts_cache import get_tts_cache
+from .encoding import get_profile
+from .workspace import job_workspace
+from .stage_timing import StageTimer, timer_or_null
 
 logger = logging.getLogger(__name__)
 
@@ -41,38 +50,61 @@ def generate_audio_elevenlabs(text: str, voice_id: str) -> Path:
     logger.info(f"   Voice ID: {voice_id}")
     logger.info(f"   Text length: {len(text)} chars")
     
-    # Call ElevenLabs API directly
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-    
-    headers = {
-        "Accept": "audio/mpeg",
-        "Content-Type": "application/json",
-        "xi-api-key": api_key
+    model_id = "eleven_multilingual_v2"
+    voice_settings = {
+        "stability": 0.5,
+        "similarity_boost": 0.75,
+        "style": 0.5,
+        "use_speaker_boost": True
     }
     
-    data = {
-        "text": text,
-        "model_id": "eleven_multilingual_v2",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.75,
-            "style": 0.5,
-            "use_speaker_boost": True
-        }
-    }
+    # Same text + voice + model + settings → same audio, skip the API call
+    cache = get_tts_cache()
+    cache_key = cache.make_key(text, voice_id, model_id, voice_settings)
+    audio_file = TEMP_DIR / f"audio_elevenlabs_{cache_key[:16]}.mp3"
     
-    logger.info(f"📡 Calling ElevenLabs API...")
-    response = requests.post(url, json=data, headers=headers, timeout=60)
+    cached = cache.get(cache_key)
+    if cached:
+        logger.info(f"♻️ TTS cache hit: {cache_key[:12]}")
+        cache.materialize(cache.cues_path(cache_key), subtitles.sidecar_path(audio_file), optional=True)
+        return cache.materialize(cached, audio_file)
     
-    if response.status_code != 200:
-        error_msg = f"ElevenLabs API error: {response.status_code} - {response.text}"
-        logger.error(f"❌ {error_msg}")
-        raise requests.HTTPError(error_msg)
+    logger.info(f"📡 Streaming from ElevenLabs API...")
+    # Unique partial name so concurrent renders of the same text never share a file
+    download_path = cache.path_for(cache_key, f".{uuid.uuid4().hex[:8]}.part")
+    alignment = None
+    try:
+        if settings.TTS_TIMESTAMPS:
+            alignment = tts_client.stream_speech_with_timestamps(
+                text=text,
+                voice_id=voice_id,
+                api_key=api_key,
+                dest=download_path,
+                model_id=model_id,
+                voice_settings=voice_settings
+            )
+        else:
+            tts_client.stream_speech(
+                text=text,
+                voice_id=voice_id,
+                api_key=api_key,
+                dest=download_path,
+                model_id=model_id,
+                voice_settings=voice_settings
+            )
+    except Exception:
+        download_path.unlink(missing_ok=True)
+        raise
     
-    # Save audio
-    audio_file = TEMP_DIR / f"audio_elevenlabs_{voice_id[:8]}_{hash(text)}.mp3"
-    with open(audio_file, "wb") as f:
-        f.write(response.content)
+    # Word timings first, so a cached audio entry never lacks its cues
+    if alignment and alignment["characters"]:
+        words = subtitles.words_from_alignment(alignment)
+        subtitles.save_words(cache.cues_path(cache_key), text, words, source="alignment")
+        cache.materialize(cache.cues_path(cache_key), subtitles.sidecar_path(audio_file))
+        logger.info(f"✅ Subtitle timings from alignment: {len(words)} words")
+    
+    # Save audio into cache
+    cache.materialize(cache.put(cache_key, download_path), audio_file)
     
     audio_size_mb = audio_file.stat().st_size / 1024 / 1024
     logger.info(f"✅ Audio generated successfully!")
@@ -82,11 +114,34 @@ def generate_audio_elevenlabs(text: str, voice_id: str) -> Path:
     return audio_file
 
 
+def split_subtitles(text: str, duration: float, words_per_line: int = 3) -> list[tuple[float, float, str]]:
+    """Split text into evenly timed (start, end, line) subtitle cues"""
+    words = text.split()
+    lines = [' '.join(words[i:i+words_per_line]) for i in range(0, len(words), words_per_line)]
+    if not lines:
+        return []
+    
+    line_duration = duration / len(lines)
+    return [(i * line_duration, (i + 1) * line_duration, line) for i, line in enumerate(lines)]
+
+
+def subtitle_cues(text: str, audio_path: Path, duration: float) -> list[tuple[float, float, str]]:
+    """Cues timed to the speech (alignment sidecar or energy segmenter), even split as last resort"""
+    try:
+        return subtitles.get_cues(text, audio_path, duration)
+    except Exception as e:
+        logger.warning(f"⚠️ Subtitle timing failed ({e}), splitting evenly")
+        return split_subtitles(text, duration)
+
+
 def create_video(
     text: str,
     background_path: Path,
     audio_path: Path,
-    text_position: str = "center"
+    text_position: str = "center",
+    background_frame=None,
+    encoding_profile: str = None,
+    timer: StageTimer = None
 ) -> tuple[Path, Path]:
     """
     Create video from components
@@ -96,38 +151,91 @@ def create_video(
         background_path: Path to background image
         audio_path: Path to audio file
         text_position: "top", "center", or "bottom"
+        background_frame: Already decoded 1080x1920 RGB frame (skips the background cache)
+        encoding_profile: Encoding profile name (see services/encoding.py), publish by default
+        timer: Optional StageTimer (audio_probe, subtitles, composite, encode spans)
     
     Returns:
         tuple: (video_path, audio_path)
     """
+    timer = timer_or_null(timer)
     logger.info(f"🎬 Creating video...")
     logger.info(f"   Background: {background_path.name}")
     logger.info(f"   Audio: {audio_path.name}")
     logger.info(f"   Text position: {text_position}")
+    logger.info(f"   Renderer: {settings.VIDEO_RENDERER}")
+    
+    profile = get_profile(encoding_profile)
+    logger.info(f"   Encoding profile: {profile.name} ({profile.width}x{profile.height}, {profile.preset}, crf {profile.crf})")
+    
+    if settings.VIDEO_RENDERER == "moviepy":
+        return _create_video_moviepy(text, background_path, audio_path, text_position, profile, timer)
     
+    try:
+        from . import compositor
+        
+        with timer.span("audio_probe"):
+            duration = compositor.probe_duration(audio_path)
+        logger.info(f"   Duration: {duration:.1f}s")
+        
+        with timer.span("subtitles"):
+            cues = subtitle_cues(text, audio_path, duration)
+        logger.info(f"✅ Prepared {len(cues)} subtitle cues at position: {text_position}")
+        
+        # Encode inside a private workspace, publish with an atomic rename
+        with job_workspace("render") as workspace:
+            output_path = TEMP_DIR / f"video_{workspace.job_id}_{profile.name}.mp4"
+            
+            logger.info(f"💾 Saving video to: {output_path}")
+            compositor.render_video(
+                background_path=background_path,
+                audio_path=audio_path,
+                cues=cues,
+                output_path=workspace.path("video.mp4"),
+                text_position=text_position,
+                duration=duration,
+                background=background_frame,
+                profile=profile,
+                timer=timer
+            )
+            workspace.commit(workspace.path("video.mp4"), output_path)
+        
+        logger.info(f"✅ Video created: {output_path}")
+        logger.info(f"   Size: {output_path.stat().st_size / 1024 / 1024:.1f} MB")
+        
+        return (output_path, audio_path)
+        
+    except Exception as e:
+        logger.error(f"❌ Error creating video: {e}")
+        raise
+
+
+def _create_video_moviepy(
+    text: str,
+    background_path: Path,
+    audio_path: Path,
+    text_position: str = "center",
+    profile=None,
+    timer: StageTimer = None
+) -> tuple[Path, Path]:
+    """Legacy MoviePy renderer (VIDEO_RENDERER=moviepy)"""
+    profile = profile or get_profile(None)
+    timer = timer_or_null(timer)
     try:
         # Import MoviePy components (correct structure for v2.x)
         from moviepy.audio.io.AudioFileClip import AudioFileClip
-        from moviepy.video.VideoClip import ImageClip, TextClip
+        from moviepy.video.VideoClip import ImageClip
+        from . import compositor
         from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
         
         # Load audio to get duration
-        audio_clip = AudioFileClip(str(audio_path))
-        duration = audio_clip.duration
+        with timer.span("audio_probe"):
+            audio_clip = AudioFileClip(str(audio_path))
+            duration = audio_clip.duration
         logger.info(f"   Duration: {duration:.1f}s")
         
-        # Create video from background image
-        video_clip = ImageClip(str(background_path)).with_duration(duration)
-        
-        # Resize to 1080x1920 (vertical format)
-        video_clip = video_clip.resized(height=1920)
-        w, h = video_clip.size
-        if w > 1080:
-            # Crop center
-            x_center = w / 2
-            x1 = int(x_center - 540)
-            x2 = int(x_center + 540)
-            video_clip = video_clip.cropped(x1=x1, x2=x2, y1=0, y2=1920)
+        # Background already scaled and cropped to 1080x1920 (vertical format)
+        video_clip = ImageClip(np.asarray(compositor.load_background(background_path))).with_duration(duration)
         
         # Add text overlay
         clips = [video_clip]
@@ -140,52 +248,54 @@ def create_video(
         else:  # center
             y_pos = 1920 / 2 - 100
         
-        # Split text into chunks for subtitles
-        words = text.split()
-        words_per_line = 3
-        lines = [' '.join(words[i:i+words_per_line]) for i in range(0, len(words), words_per_line)]
-        
         # Create text clips
-        for i, line in enumerate(lines):
-            start_time = (i / len(lines)) * duration
-            txt_duration = duration / len(lines)
-            
-            txt_clip = TextClip(
-                text=line,
-                font_size=50,
-                color='white',
-                font='Arial',
-                stroke_color='black',
-                stroke_width=3,
-                size=(980, None),
-                method='caption'
-            ).with_position(('center', y_pos)).with_start(start_time).with_duration(txt_duration)
-            
-            clips.append(txt_clip)
+        with timer.span("subtitles"):
+            cues = subtitle_cues(text, audio_path, duration)
+        with timer.span("composite"):
+            for start_time, end_time, line in cues:
+                # Same cached card as the native renderer instead of TextClip
+                card = compositor.render_subtitle_card(line)
+                txt_clip = ImageClip(card, transparent=True).with_position(('center', y_pos)).with_start(start_time).with_duration(end_time - start_time)
+                
+                clips.append(txt_clip)
         
-        logger.info(f"✅ Added {len(lines)} text overlays at position: {text_position}")
+        logger.info(f"✅ Added {len(cues)} text overlays at position: {text_position}")
         
         # Composite
         final_clip = CompositeVideoClip(clips, size=(1080, 1920))
         final_clip = final_clip.with_audio(audio_clip)
         
-        # Save
-        output_path = TEMP_DIR / f"video_{hash(text)}_{hash(str(background_path))}.mp4"
-        
-        logger.info(f"💾 Saving video to: {output_path}")
-        final_clip.write_videofile(
-            str(output_path),
-            fps=24,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile=str(TEMP_DIR / "temp_audio.m4a"),
-            remove_temp=True,
-            logger=None
-        )
+        # Save (intermediate files stay in a private workspace)
+        ffmpeg_params = ['-crf', str(profile.crf), '-pix_fmt', 'yuv420p', *profile.container_args()]
+        if profile.maxrate:
+            ffmpeg_params += ['-maxrate', profile.maxrate, '-bufsize', profile.bufsize or profile.maxrate]
+        if (profile.width, profile.height) != (1080, 1920):
+            ffmpeg_params += ['-vf', f'scale={profile.width}:{profile.height}']
         
-        # Cleanup
-        audio_clip.close()
-        final_clip.close()
+        try:
+            with job_workspace("render") as workspace:
+                output_path = TEMP_DIR / f"video_{workspace.job_id}_{profile.name}.mp4"
+                
+                logger.info(f"💾 Saving video to: {output_path}")
+                with timer.span("encode"):
+                    final_clip.write_videofile(
+                        str(workspace.path("video.mp4")),
+                        fps=profile.fps,
+                        codec='libx264',
+                        preset=profile.preset,
+                        threads=profile.threads or None,
+                        ffmpeg_params=ffmpeg_params,
+                        audio_codec='aac',
+                        audio_bitrate=profile.audio_bitrate,
+                        temp_audiofile=str(workspace.path("temp_audio.m4a")),
+                        remove_temp=True,
+                        logger=None
+                    )
+                workspace.commit(workspace.path("video.mp4"), output_path)
+        finally:
+            # Cleanup
+            audio_clip.close()
+            final_clip.close()
         
         logger.info(f"✅ Video created: {output_path}")
         logger.info(f"   Size: {output_path.stat().st_size / 1024 / 1024:.1f} MB")
@@ -197,12 +307,68 @@ def create_video(
         raise
 
 
+def resolve_background_path(background_url: str) -> Path:
+    """Map a /storage/backgrounds/... URL to an existing file"""
+    from .. import storage as storage_module
+    
+    # Ensure storage is initialized
+    if not storage_module.STORAGE_ROOT:
+        logger.error("❌ STORAGE_ROOT is None! Initializing...")
+        storage_module.init_storage()
+        
+    if not storage_module.STORAGE_ROOT:
+        raise ValueError("STORAGE_ROOT not initialized!")
+    
+    logger.info(f"✅ STORAGE_ROOT: {storage_module.STORAGE_ROOT}")
+    
+    if background_url and background_url.startswith('/storage/'):
+        relative_path = background_url.replace('/storage/', '')
+        background_path = storage_module.STORAGE_ROOT / relative_path
+        logger.info(f"🔄 Background URL → Path: {background_path}")
+    else:
+        raise ValueError(f"Invalid background URL: {background_url}")
+    
+    if not background_path.exists():
+        raise FileNotFoundError(f"Background not found: {background_path}")
+    
+    logger.info(f"✅ Background found: {background_path.name}")
+    return background_path
+
+
+def encode_video(
+    text: str,
+    background_url: str,
+    audio_path: str,
+    text_position: str = "center",
+    encoding_profile: str = None,
+    timer: StageTimer = None
+) -> str:
+    """
+    Render an already voiced script with another encoding profile
+    
+    Used for the background publish encode after a preview was delivered.
+    
+    Returns:
+        video_url (file://...)
+    """
+    with timer_or_null(timer).span("background"):
+        background_path = resolve_background_path(background_url)
+    
+    from . import render_pool
+    video_path, _ = render_pool.render(
+        text, background_path, Path(audio_path), text_position, encoding_profile, timer=timer
+    )
+    return f"file://{video_path.absolute()}"
+
+
 def generate_video_simple(
     text: str,
     voice_id: str,
     background_url: str,
     text_position: str = "center",
-    progress_callback=None
+    progress_callback=None,
+    encoding_profile: str = None,
+    timer: StageTimer = None
 ) -> tuple[str, str]:
     """
     Main video generation function - uses ONLY frontend settings
@@ -213,10 +379,13 @@ def generate_video_simple(
         background_url: Background image URL from frontend (/storage/backgrounds/...)
         text_position: Text position from frontend
         progress_callback: Optional callback for progress updates
+        encoding_profile: Encoding profile name (publish by default, "preview" for the fast tier)
+        timer: Optional StageTimer collecting per-stage durations
     
     Returns:
         tuple: (video_url, audio_url)
     """
+    timer = timer_or_null(timer)
     logger.info(f"🎬 ========================================")
     logger.info(f"🎬 SIMPLE VIDEO GENERATION (Frontend Settings Only)")
     logger.info(f"🎬 ========================================")
@@ -230,48 +399,31 @@ def generate_video_simple(
             progress_callback("processing", 10)
         
         # 1. Convert background URL to filesystem path
-        from .. import storage as storage_module
-        
-        # Ensure storage is initialized
-        if not storage_module.STORAGE_ROOT:
-            logger.error("❌ STORAGE_ROOT is None! Initializing...")
-            storage_module.init_storage()
-            
-        if not storage_module.STORAGE_ROOT:
-            raise ValueError("STORAGE_ROOT not initialized!")
-        
-        logger.info(f"✅ STORAGE_ROOT: {storage_module.STORAGE_ROOT}")
-        
-        if background_url and background_url.startswith('/storage/'):
-            relative_path = background_url.replace('/storage/', '')
-            background_path = storage_module.STORAGE_ROOT / relative_path
-            logger.info(f"🔄 Background URL → Path: {background_path}")
-        else:
-            raise ValueError(f"Invalid background URL: {background_url}")
-        
-        if not background_path.exists():
-            raise FileNotFoundError(f"Background not found: {background_path}")
-        
-        logger.info(f"✅ Background found: {background_path.name}")
+        with timer.span("background"):
+            background_path = resolve_background_path(background_url)
         
         if progress_callback:
             progress_callback("processing", 30)
         
         # 2. Generate audio with selected voice (NO FALLBACK - must use ElevenLabs)
         logger.info(f"🎤 Generating audio with voice: {voice_id}")
-        audio_path = generate_audio_elevenlabs(text, voice_id)
+        with timer.span("tts"):
+            audio_path = generate_audio_elevenlabs(text, voice_id)
         # If ElevenLabs fails → exception raised → video generation fails
         # NO fallback to gTTS!
         
         if progress_callback:
             progress_callback("processing", 60)
         
-        # 3. Create video
-        video_path, audio_path = create_video(
+        # 3. Create video (warm render pool when available)
+        from . import render_pool
+        video_path, audio_path = render_pool.render(
             text=text,
             background_path=background_path,
             audio_path=audio_path,
-            text_position=text_position
+            text_position=text_position,
+            encoding_profile=encoding_profile,
+            timer=timer
         )
         
         if progress_callback:
@@ -0,0 +1,202 @@
+"""
+Per-job scratch workspaces
+
+Every render gets its own directory under TEMP_DIR/jobs, so concurrent jobs
+never share intermediate files. Finished outputs are moved into place with
+an atomic rename and the directory is removed on success or failure.
+
+A job killed outright (SIGKILL revoke, OOM) cannot clean up after itself.
+Each workspace therefore records its owner's PID, and directories whose
+owner is gone are swept whenever a job starts and at worker start.
+
+A disk quota covers all workspaces on the node. Each job reserves space up
+front and new jobs wait while the quota is exhausted.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+OWNER_FILE = "owner.json"
+
+
+class WorkspaceQuotaExceeded(RuntimeError):
+    """No room for another job workspace within WORKSPACE_QUOTA_MB"""
+
+
+class JobWorkspace:
+    """Scratch directory of one job"""
+
+    def __init__(self, root: Path, job_id: str):
+        self.job_id = job_id
+        self.dir = root / job_id
+
+    def path(self, name: str) -> Path:
+        """File inside the workspace"""
+        return self.dir / name
+
+    def commit(self, source: Path, dest: Path) -> Path:
+        """Atomically move a finished file out of the workspace"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(source, dest)
+        except OSError:
+            # Different filesystem: copy next to dest, then rename
+            tmp = dest.with_name(f".{dest.name}.{self.job_id}.tmp")
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, dest)
+        return dest
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    try:
+        for entry in path.rglob("*"):
+            try:
+                if entry.is_file():
+                    total += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+    except FileNotFoundError:
+        # Workspace removed while we were counting
+        pass
+    return total
+
+
+class WorkspaceManager:
+    """Creates, tracks and sweeps job workspaces under one root"""
+
+    def __init__(self, root: Path, quota_bytes: int, reserve_bytes: int):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.reserve_bytes = reserve_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.root / ".lock"
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _owner(self, job_dir: Path) -> Optional[dict]:
+        try:
+            return json.loads((job_dir / OWNER_FILE).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _is_stale(self, job_dir: Path) -> bool:
+        owner = self._owner(job_dir)
+        if owner is None:
+            # Owner file is written right after mkdir; give a racing creator a moment
+            try:
+                return time.time() - job_dir.stat().st_mtime > 60
+            except FileNotFoundError:
+                return False
+        if owner.get("host") != socket.gethostname():
+            # Shared volume across hosts: only trust age
+            return time.time() - owner.get("created_at", 0) > settings.WORKSPACE_MAX_AGE
+        return not _pid_alive(owner["pid"])
+
+    def sweep(self) -> int:
+        """Remove workspaces whose owning process is gone"""
+        removed = 0
+        for job_dir in self.root.iterdir():
+            if not job_dir.is_dir() or not self._is_stale(job_dir):
+                continue
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed += 1
+            logger.warning(f"🧹 Removed stale job workspace {job_dir.name}")
+        return removed
+
+    def usage(self) -> int:
+        """Bytes used or reserved by live workspaces"""
+        total = 0
+        for job_dir in self.root.iterdir():
+            if not job_dir.is_dir():
+                continue
+            owner = self._owner(job_dir) or {}
+            total += max(_dir_size(job_dir), owner.get("reserved", 0))
+        return total
+
+    def _create(self, job_id: str, reserve: int) -> JobWorkspace:
+        deadline = time.time() + settings.WORKSPACE_QUOTA_WAIT
+        self.sweep()
+        while True:
+            with self._locked():
+                used = self.usage()
+                if used + reserve <= self.quota_bytes:
+                    workspace = JobWorkspace(self.root, job_id)
+                    workspace.dir.mkdir()
+                    (workspace.dir / OWNER_FILE).write_text(json.dumps({
+                        "pid": os.getpid(),
+                        "host": socket.gethostname(),
+                        "created_at": time.time(),
+                        "reserved": reserve,
+                    }))
+                    return workspace
+
+            if time.time() >= deadline:
+                raise WorkspaceQuotaExceeded(
+                    f"Job workspaces use {used / 1024 / 1024:.0f} MB of "
+                    f"{self.quota_bytes / 1024 / 1024:.0f} MB quota"
+                )
+            logger.info(f"⏳ Workspace quota full ({used / 1024 / 1024:.0f} MB), waiting...")
+            time.sleep(5)
+            self.sweep()
+
+    @contextmanager
+    def job(self, prefix: str = "job", reserve: Optional[int] = None):
+        """Workspace for the duration of the with-block, always removed afterwards"""
+        job_id = f"{prefix}-{uuid.uuid4().hex[:12]}"
+        workspace = self._create(job_id, self.reserve_bytes if reserve is None else reserve)
+        try:
+            yield workspace
+        finally:
+            shutil.rmtree(workspace.dir, ignore_errors=True)
+
+
+_manager: Optional[WorkspaceManager] = None
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    global _manager
+    if _manager is None:
+        from .video_generator import TEMP_DIR
+
+        _manager = WorkspaceManager(
+            TEMP_DIR / "jobs",
+            quota_bytes=settings.WORKSPACE_QUOTA_MB * 1024 * 1024,
+            reserve_bytes=settings.WORKSPACE_RESERVE_MB * 1024 * 1024,
+        )
+    return _manager
+
+
+def job_workspace(prefix: str = "job", reserve: Optional[int] = None):
+    """Shortcut: with job_workspace("render") as ws: ..."""
+    return get_workspace_manager().job(prefix, reserve)
@@ -1,14 +1,18 @@
 """Celery tasks for automation"""
 import logging
-from datetime import datetime
-from celery import group
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from celery import chain
+from celery.exceptions import Retry
 from celery.schedules import crontab
 from .celery_app import celery_app
+from ..config import settings
 from ..database import SessionLocal
-from ..models_extended import ScheduledPost, AutomationLog
-from ..services import scheduler_service
-from .video_tasks import generate_scripts_task, generate_video_task
-from .publish_tasks import publish_video_task
+from .. import models
+from ..models_extended import ScheduledPost
+from ..services import scheduler_service, generator
+from .video_tasks import render_script_video
+from .publish_tasks import PublishNotReady, load_publish_target, publish_platforms
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,10 @@ def create_daily_schedule_task():
     try:
         result = scheduler_service.create_daily_schedule(db)
         logger.info(f"Daily schedule created: {result}")
+        
+        # Posts whose lead window is already open start now, the rest on the 5-minute tick
+        posts = scheduler_service.get_pending_posts(db, settings.PIPELINE_LEAD_MINUTES)
+        result["dispatched"] = dispatch_post_pipelines(db, posts)
         return result
     except Exception as e:
         logger.error(f"Error creating daily schedule: {e}")
@@ -36,78 +44,306 @@ def create_daily_schedule_task():
         db.close()
 
 
+def _as_utc(moment: datetime) -> datetime:
+    """Scheduled times may come back naive (local server time)"""
+    return moment.astimezone(timezone.utc)
+
+
+def _platforms_for(post: ScheduledPost) -> list[str]:
+    platforms = []
+    if post.publish_to_telegram:
+        platforms.append("telegram")
+    if post.publish_to_youtube:
+        platforms.append("youtube")
+    if post.publish_to_tiktok:
+        platforms.append("tiktok")
+    if post.publish_to_instagram:
+        platforms.append("instagram")
+    return platforms
+
+
+def _claim_post(db, post_id: int, from_statuses: tuple, to_status: str) -> bool:
+    """
+    Atomically move a post between statuses
+
+    Only one caller wins, so a redelivered or duplicated message cannot run
+    the same stage twice.
+    """
+    claimed = db.query(ScheduledPost).filter(
+        ScheduledPost.id == post_id,
+        ScheduledPost.status.in_(from_statuses)
+    ).update({ScheduledPost.status: to_status}, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+
+def dispatch_post_pipelines(db, posts: list[ScheduledPost]) -> int:
+    """
+    Launch script → post text → video → publish chains for pending posts
+
+    Chains are queued immediately: callers pass posts whose start time
+    (scheduled_time - PIPELINE_LEAD_MINUTES) has come, see
+    process_pending_posts_task. Nothing sits in the broker with a long ETA;
+    only the publish stage waits for the slot, at most the lead time.
+    """
+    dispatched = 0
+    
+    for post in posts:
+        if not _claim_post(db, post.id, ("pending",), "queued"):
+            continue
+        
+        chain(
+            post_generate_script_task.si(post.id),
+            post_generate_text_task.s(),
+            post_generate_video_task.s(),
+            post_publish_task.s(),
+        ).apply_async()
+        
+        dispatched += 1
+        logger.info(f"Pipeline for post {post.id} queued (slot {post.scheduled_time.isoformat()})")
+    
+    return dispatched
+
+
+def _fail_post(post_id: int, stage: str, error: Exception):
+    """Mark post failed and log an automation error"""
+    db = SessionLocal()
+    try:
+        post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
+        if post:
+            post.status = "failed"
+            post.error_message = f"{stage}: {error}"
+            db.commit()
+        
+        scheduler_service.log_automation_error(
+            db,
+            f"Ошибка обработки поста {post_id} ({stage})",
+            str(error)
+        )
+    finally:
+        db.close()
+
+
+def _get_post(db, post_id: int) -> ScheduledPost:
+    post = db.query(ScheduledPost).filter(ScheduledPost.id == post_id).first()
+    if not post:
+        raise ValueError(f"Scheduled post {post_id} not found")
+    return post
+
+
+@celery_app.task
+def post_generate_script_task(post_id: int):
+    """Pipeline stage 1: generate a script for the post"""
+    db = SessionLocal()
+    try:
+        post = _get_post(db, post_id)
+        
+        if not post.script_id:
+            logger.info(f"Generating script for post {post.id}")
+            post.status = "generating_script"
+            db.commit()
+            
+            scripts_data = generator.generate_scripts(db, 1)
+            if not scripts_data:
+                raise RuntimeError("Script generation returned nothing")
+            
+            script_data = scripts_data[0]
+            db_script = models.Script(
+                theme=script_data["theme"],
+                script=script_data["script"],
+                hook=script_data["hook"],
+                caption=script_data["caption"],
+                status="draft"
+            )
+            db.add(db_script)
+            db.flush()
+            
+            post.script_id = db_script.id
+            post.caption = db_script.caption
+            db.commit()
+        
+        return {"post_id": post.id, "script_id": post.script_id}
+    
+    except Exception as e:
+        logger.error(f"Error generating script for post {post_id}: {e}")
+        _fail_post(post_id, "script", e)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def post_generate_text_task(ctx: dict):
+    """Pipeline stage 2: clean post text for the voiceover"""
+    db = SessionLocal()
+    try:
+        script = db.query(models.Script).filter(models.Script.id == ctx["script_id"]).first()
+        if not script:
+            raise ValueError(f"Script {ctx['script_id']} not found")
+        
+        if not script.post_text:
+            script.post_text = generator.generate_clean_post(script.script, script.theme, db)
+            db.commit()
+        
+        return ctx
+    
+    except Exception as e:
+        logger.error(f"Error generating post text for post {ctx['post_id']}: {e}")
+        _fail_post(ctx["post_id"], "post_text", e)
+        raise
+    finally:
+        db.close()
+
+
+def _automation_background(db) -> str:
+    """Background URL for automated videos (/storage/backgrounds/...)"""
+    from .. import storage as storage_module
+    if not storage_module.STORAGE_ROOT:
+        storage_module.init_storage()
+    
+    path = generator.get_setting(db, "automation_background") or generator.get_setting(db, "custom_background_path")
+    if path and path.startswith("/storage/"):
+        return path
+    if path:
+        try:
+            relative = Path(path).resolve().relative_to(storage_module.STORAGE_ROOT.resolve())
+            return f"/storage/{relative.as_posix()}"
+        except ValueError:
+            logger.warning(f"Automation background outside storage, ignoring: {path}")
+    
+    from ..services.image_generator import ImageGenerator
+    image_generator = ImageGenerator(str(storage_module.BACKGROUNDS_DIR))
+    # Prefetched background if one is ready, otherwise generate (cached per prompt/size)
+    image_path = image_generator.take_prefetched("cosmic") or image_generator.generate_background(
+        "cosmic", width=1080, height=1920
+    )
+    return f"/storage/backgrounds/{Path(image_path).name}"
+
+
+@celery_app.task(bind=True)
+def post_generate_video_task(self, ctx: dict):
+    """Pipeline stage 3: render the video"""
+    db = SessionLocal()
+    try:
+        post = _get_post(db, ctx["post_id"])
+        if post.video_id:
+            # Redelivered after the render finished
+            logger.info(f"Post {post.id} already has video {post.video_id}, skipping render")
+            return {**ctx, "video_id": post.video_id}
+        
+        post.status = "generating_video"
+        db.commit()
+        
+        voice_id = generator.get_setting(db, "voice_id", settings.AUTOMATION_VOICE_ID)
+        text_position = generator.get_setting(db, "text_position", "center")
+        background = _automation_background(db)
+    finally:
+        db.close()
+    
+    try:
+        result = render_script_video(self.request.id, ctx["script_id"], text_position, background, voice_id)
+    except Exception as e:
+        logger.error(f"Error generating video for post {ctx['post_id']}: {e}")
+        _fail_post(ctx["post_id"], "video", e)
+        raise
+    
+    db = SessionLocal()
+    try:
+        post = _get_post(db, ctx["post_id"])
+        post.video_id = result["video_id"]
+        post.status = "generated"
+        db.commit()
+    finally:
+        db.close()
+    
+    return {**ctx, "video_id": result["video_id"]}
+
+
+@celery_app.task(bind=True)
+def post_publish_task(self, ctx: dict):
+    """Pipeline stage 4: publish at the scheduled slot"""
+    db = SessionLocal()
+    try:
+        post = _get_post(db, ctx["post_id"])
+        
+        # Ready early - come back exactly at the slot
+        slot = _as_utc(post.scheduled_time)
+        if slot > datetime.now(timezone.utc) + timedelta(seconds=5):
+            post_publish_task.apply_async((ctx,), eta=slot)
+            logger.info(f"Post {post.id} ready, publishing at {slot.isoformat()}")
+            return {**ctx, "publish_at": slot.isoformat()}
+        
+        if post.status != "generated":
+            logger.warning(f"Post {post.id} is {post.status}, not publishing again")
+            return {**ctx, "skipped": post.status}
+        
+        try:
+            video_path, caption = load_publish_target(ctx["video_id"])
+        except PublishNotReady as e:
+            logger.info(f"{e}, retrying post {post.id}")
+            raise self.retry(countdown=30, max_retries=40)
+        
+        # Publish once: a duplicate message finds the post already claimed
+        if not _claim_post(db, post.id, ("generated",), "publishing"):
+            logger.warning(f"Post {post.id} was claimed by another worker, not publishing again")
+            return {**ctx, "skipped": "publishing"}
+        
+        # The post status depends on the per-platform results, so fan out in
+        # this task (PUBLISH_FANOUT=chord only applies to publish_video_task)
+        platforms = _platforms_for(post)
+        results = {}
+        if platforms:
+            logger.info(f"Publishing video {ctx['video_id']} for post {post.id}")
+            results = publish_platforms(
+                ctx["video_id"], platforms, video_path, caption,
+                sequential=settings.PUBLISH_FANOUT == "sequential"
+            )
+        
+        failures = [f"{platform}: {result}" for platform, result in results.items() if result != "success"]
+        if platforms and len(failures) == len(platforms):
+            raise RuntimeError("; ".join(failures))
+        
+        post.status = "published"
+        post.published_at = datetime.utcnow()
+        post.error_message = "; ".join(failures) or None
+        db.commit()
+        
+        published = [platform for platform, result in results.items() if result == "success"]
+        logger.info(f"Post {post.id} published to {', '.join(published)}")
+        if failures:
+            logger.warning(f"Post {post.id} failed on {'; '.join(failures)}")
+        
+        return {**ctx, "results": results}
+    
+    except Retry:
+        raise
+    except Exception as e:
+        logger.error(f"Error publishing post {ctx['post_id']}: {e}")
+        _fail_post(ctx["post_id"], "publish", e)
+        raise
+    finally:
+        db.close()
+
+
 @celery_app.task
 def process_pending_posts_task():
     """
-    Обработка pending постов
+    Запуск пайплайнов для постов, у которых наступило время старта
     Запускается каждые 5 минут
     
-    Для каждого поста:
-    1. Генерирует script (если нет)
-    2. Генерирует video (если нет)
-    3. Публикует (когда готово)
+    Пайплайн стартует за PIPELINE_LEAD_MINUTES до scheduled_time; сюда же
+    попадают просроченные посты (например, созданные вручную).
     """
     db = SessionLocal()
     try:
-        pending_posts = scheduler_service.get_pending_posts(db)
+        pending_posts = scheduler_service.get_pending_posts(db, settings.PIPELINE_LEAD_MINUTES)
         
         if not pending_posts:
             logger.info("No pending posts to process")
             return {"processed": 0}
         
-        logger.info(f"Processing {len(pending_posts)} pending posts...")
-        
-        for post in pending_posts:
-            try:
-                # 1. Generate script if not exists
-                if not post.script_id:
-                    logger.info(f"Generating script for post {post.id}")
-                    result = generate_scripts_task.delay(1)
-                    # Mark as in progress
-                    post.status = "generating_script"
-                    db.commit()
-                    continue
-                
-                # 2. Generate video if not exists
-                if not post.video_id:
-                    logger.info(f"Generating video for post {post.id}, script {post.script_id}")
-                    result = generate_video_task.delay(post.script_id)
-                    post.status = "generating_video"
-                    db.commit()
-                    continue
-                
-                # 3. Publish video
-                logger.info(f"Publishing video {post.video_id} for post {post.id}")
-                platforms = []
-                if post.publish_to_telegram:
-                    platforms.append("telegram")
-                if post.publish_to_youtube:
-                    platforms.append("youtube")
-                if post.publish_to_tiktok:
-                    platforms.append("tiktok")
-                if post.publish_to_instagram:
-                    platforms.append("instagram")
-                
-                if platforms:
-                    publish_video_task.delay(post.video_id, platforms)
-                    post.status = "published"
-                    post.published_at = datetime.utcnow()
-                    db.commit()
-                    logger.info(f"Post {post.id} published to {', '.join(platforms)}")
-            
-            except Exception as e:
-                logger.error(f"Error processing post {post.id}: {e}")
-                post.status = "failed"
-                post.error_message = str(e)
-                db.commit()
-                
-                scheduler_service.log_automation_error(
-                    db,
-                    f"Ошибка обработки поста {post.id}",
-                    str(e)
-                )
-        
-        return {"processed": len(pending_posts)}
+        logger.info(f"Dispatching pipelines for {len(pending_posts)} due posts...")
+        return {"processed": dispatch_post_pipelines(db, pending_posts)}
     
     finally:
         db.close()
@@ -121,10 +357,7 @@ def check_and_notify_errors_task():
     """
     db = SessionLocal()
     try:
-        unnotified_errors = db.query(AutomationLog).filter(
-            AutomationLog.level == "ERROR",
-            AutomationLog.notified == False
-        ).limit(10).all()
+        unnotified_errors = scheduler_service.unnotified_errors_query(db).all()
         
         if not unnotified_errors:
             return {"notified": 0}
@@ -160,6 +393,29 @@ def check_and_notify_errors_task():
         db.close()
 
 
+@celery_app.task
+def prefetch_backgrounds_task():
+    """Top up the pool of ready render-size backgrounds for every theme"""
+    from .. import storage as storage_module
+    from ..services.image_generator import ImageGenerator
+    if not storage_module.BACKGROUNDS_DIR:
+        storage_module.init_storage()
+    
+    image_generator = ImageGenerator(str(storage_module.BACKGROUNDS_DIR))
+    image_generator.sweep_locks()
+    created = image_generator.prefetch(per_theme=settings.BACKGROUND_PREFETCH_PER_THEME)
+    
+    # Pre-scaled frames for prefetched and uploaded backgrounds (keyed by content, survive the move into place)
+    from ..services.background_cache import get_background_cache
+    cache = get_background_cache()
+    prepared = cache.prepare_dir(storage_module.BACKGROUNDS_DIR)
+    for theme_dir in (storage_module.BACKGROUNDS_DIR / "prefetch").glob("*"):
+        if theme_dir.is_dir():
+            prepared += cache.prepare_dir(theme_dir)
+    
+    return {"status": "success", "prefetched": created, "prepared": prepared}
+
+
 # Configure Celery Beat schedule
 @celery_app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
@@ -185,4 +441,11 @@ def setup_periodic_tasks(sender, **kwargs):
         check_and_notify_errors_task.s(),
         name='check-notify-errors'
     )
+    
+    # Keep prefetched backgrounds topped up every 30 minutes
+    sender.add_periodic_task(
+        60.0 * 30,  # 30 minutes
+        prefetch_backgrounds_task.s(),
+        name='prefetch-backgrounds'
+    )
 
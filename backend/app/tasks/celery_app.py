@@ -1,6 +1,9 @@
 """Celery configuration"""
 from celery import Celery
+from celery.signals import worker_ready
+from kombu import Queue
 from ..config import settings
+from ..services import telemetry
 
 celery_app = Celery(
     "allaboutme",
@@ -13,6 +16,34 @@ celery_app = Celery(
     ]
 )
 
+# Queues (see run_worker.sh for how each is served):
+#   llm        - Groq completions, short network-bound jobs
+#   render     - CPU-bound video rendering
+#   publish    - uploads to Telegram / Instagram / YouTube / TikTok
+#   automation - beat ticks and schedule maintenance
+#   celery     - anything not routed below
+# render takes one job per thread with prefetch 1 so a long render never
+# holds queued jobs hostage (frames are rendered by the warm process pool in
+# services/render_pool.py); the other queues share a threaded I/O pool.
+TASK_ROUTES = {
+    "app.tasks.video_tasks.generate_scripts_task": {"queue": "llm"},
+    "app.tasks.video_tasks.generate_post_text_task": {"queue": "llm"},
+    "app.tasks.automation_tasks.post_generate_script_task": {"queue": "llm"},
+    "app.tasks.automation_tasks.post_generate_text_task": {"queue": "llm"},
+
+    "app.tasks.video_tasks.generate_video_task": {"queue": "render"},
+    "app.tasks.video_tasks.encode_publish_task": {"queue": "render"},
+    "app.tasks.automation_tasks.post_generate_video_task": {"queue": "render"},
+
+    "app.tasks.publish_tasks.*": {"queue": "publish"},
+    "app.tasks.automation_tasks.post_publish_task": {"queue": "publish"},
+
+    "app.tasks.automation_tasks.create_daily_schedule_task": {"queue": "automation"},
+    "app.tasks.automation_tasks.process_pending_posts_task": {"queue": "automation"},
+    "app.tasks.automation_tasks.check_and_notify_errors_task": {"queue": "automation"},
+    "app.tasks.automation_tasks.prefetch_backgrounds_task": {"queue": "automation"},
+}
+
 # Celery configuration
 celery_app.conf.update(
     task_serializer="json",
@@ -23,5 +54,24 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=3600,  # 1 hour
     task_soft_time_limit=3300,  # 55 minutes
+    task_queues=[Queue(name) for name in ("celery", "llm", "render", "publish", "automation")],
+    task_default_queue="celery",
+    task_routes=TASK_ROUTES,
+    worker_prefetch_multiplier=1,
+    # Redis redelivers unacked messages (including ones waiting for an ETA)
+    # after visibility_timeout. The longest ETA is the publish stage waiting
+    # PIPELINE_LEAD_MINUTES for its slot, so stay well above that.
+    broker_transport_options={
+        "visibility_timeout": max(3600, (settings.PIPELINE_LEAD_MINUTES + 60) * 60)
+    },
 )
 
+
+# Task duration / outcome metrics (served by the API's /metrics)
+telemetry.connect_celery_signals()
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    if settings.WORKER_METRICS_PORT:
+        telemetry.start_worker_server()
@@ -1,83 +1,177 @@
 """Celery tasks for publishing videos"""
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sqlalchemy.orm import Session
+from celery import chord
 from .celery_app import celery_app
 from ..database import SessionLocal
 from .. import models
+from ..config import settings
 from ..services import publisher
 
 logger = logging.getLogger(__name__)
 
+PLATFORM_PUBLISHERS = {
+    "telegram": publisher._post_telegram,
+    "instagram": publisher._post_instagram_reel,
+    "youtube": publisher._post_youtube_short,
+    "tiktok": publisher._post_tiktok,
+}
 
-@celery_app.task(bind=True)
-def publish_video_task(self, video_id: int, platforms: list):
-    """Publish video to selected platforms asynchronously"""
+
+def publish_to_platform(video_id: int, platform: str, video_path: str, caption: str) -> str:
+    """
+    Publish to a single platform.
+
+    Owns its own DB session and Publication row, so it is safe to run
+    concurrently from threads or separate Celery subtasks.
+    """
+    db = SessionLocal()
+    pub = None
+
+    try:
+        # Create publication record
+        pub = models.Publication(
+            video_id=video_id,
+            platform=platform,
+            status="pending"
+        )
+        db.add(pub)
+        db.commit()
+        db.refresh(pub)
+
+        post = PLATFORM_PUBLISHERS.get(platform)
+        if not post:
+            raise ValueError(f"Unknown platform: {platform}")
+
+        post(video_path, caption)
+
+        # Update publication status
+        pub.status = "published"
+        pub.published_at = datetime.utcnow()
+        db.commit()
+
+        logger.info(f"Published video {video_id} to {platform}")
+        return "success"
+
+    except Exception as e:
+        logger.error(f"Error publishing to {platform}: {e}")
+
+        # Update publication with error
+        if pub is not None:
+            db.rollback()
+            pub.status = "failed"
+            pub.error_message = str(e)
+            db.commit()
+
+        return f"error: {str(e)}"
+
+    finally:
+        db.close()
+
+
+@celery_app.task
+def publish_platform_task(video_id: int, platform: str, video_path: str, caption: str):
+    """Chord header: publish one platform"""
+    return {
+        "platform": platform,
+        "result": publish_to_platform(video_id, platform, video_path, caption)
+    }
+
+
+@celery_app.task
+def collect_publish_results_task(platform_results: list, video_id: int):
+    """Chord callback: merge per-platform results"""
+    results = {item["platform"]: item["result"] for item in platform_results}
+    logger.info(f"Publishing of video {video_id} finished: {results}")
+
+    return {
+        "video_id": video_id,
+        "results": results
+    }
+
+
+class PublishNotReady(Exception):
+    """Only the preview exists yet - the publish-quality encode is still running"""
+
+
+def load_publish_target(video_id: int) -> tuple[str, str]:
+    """(video_path, caption) of a video ready to publish"""
     db = SessionLocal()
-    
     try:
-        # Get video
         video = db.query(models.Video).filter(models.Video.id == video_id).first()
         
         if not video:
             raise ValueError(f"Video {video_id} not found")
         
+        if video.preview_path and video.video_path == video.preview_path:
+            raise PublishNotReady(f"Video {video_id} publish encode not ready")
+        
         # Get script for caption
         caption = ""
         if video.script:
             caption = video.script.caption or video.script.hook or ""
         
-        results = {}
+        return video.video_path, caption
+    
+    finally:
+        db.close()
+
+
+def publish_platforms(video_id: int, platforms: list, video_path: str, caption: str, sequential: bool = False) -> dict:
+    """
+    Publish to every platform in this process and return {platform: result}
+    
+    Platforms run on a bounded thread pool unless sequential (or only one).
+    """
+    # One shared local copy of the video for every uploader in this process
+    with publisher.video_artifact(video_path, fetch=False):
+        if sequential or len(platforms) <= 1:
+            return {
+                platform: publish_to_platform(video_id, platform, video_path, caption)
+                for platform in platforms
+            }
         
-        # Publish to each platform
-        for platform in platforms:
-            try:
-                # Create publication record
-                pub = models.Publication(
-                    video_id=video_id,
-                    platform=platform,
-                    status="pending"
-                )
-                db.add(pub)
-                db.commit()
-                db.refresh(pub)
-                
-                # Publish based on platform
-                if platform == "telegram":
-                    publisher._post_telegram(video.video_path, caption)
-                elif platform == "instagram":
-                    publisher._post_instagram_reel(video.video_path, caption)
-                elif platform == "youtube":
-                    publisher._post_youtube_short(video.video_path, caption)
-                elif platform == "tiktok":
-                    publisher._post_tiktok(video.video_path, caption)
-                else:
-                    raise ValueError(f"Unknown platform: {platform}")
-                
-                # Update publication status
-                pub.status = "published"
-                pub.published_at = datetime.utcnow()
-                db.commit()
-                
-                results[platform] = "success"
-                logger.info(f"Published video {video_id} to {platform}")
-            
-            except Exception as e:
-                logger.error(f"Error publishing to {platform}: {e}")
-                
-                # Update publication with error
-                if 'pub' in locals():
-                    pub.status = "failed"
-                    pub.error_message = str(e)
-                    db.commit()
-                
-                results[platform] = f"error: {str(e)}"
+        workers = min(len(platforms), settings.PUBLISH_MAX_THREADS)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish") as pool:
+            futures = {
+                platform: pool.submit(publish_to_platform, video_id, platform, video_path, caption)
+                for platform in platforms
+            }
+            return {platform: future.result() for platform, future in futures.items()}
+
+
+@celery_app.task(bind=True)
+def publish_video_task(self, video_id: int, platforms: list):
+    """
+    Publish video to selected platforms asynchronously
+
+    PUBLISH_FANOUT selects how platforms run:
+    - threads: bounded thread pool inside this task (default)
+    - chord: one Celery subtask per platform, results merged by a chord callback
+    - sequential: one platform after another
+    """
+    try:
+        video_path, caption = load_publish_target(video_id)
+    except PublishNotReady as e:
+        logger.info(f"{e}, retrying")
+        raise self.retry(countdown=30, max_retries=40)
+    
+    mode = settings.PUBLISH_FANOUT
+    
+    if mode == "chord" and len(platforms) > 1:
+        result = chord(
+            publish_platform_task.s(video_id, platform, video_path, caption)
+            for platform in platforms
+        )(collect_publish_results_task.s(video_id))
         
+        logger.info(f"Dispatched publish chord {result.id} for video {video_id}")
         return {
             "video_id": video_id,
-            "results": results
+            "chord_id": result.id
         }
     
-    finally:
-        db.close()
-
+    return {
+        "video_id": video_id,
+        "results": publish_platforms(video_id, platforms, video_path, caption, sequential=mode == "sequential")
+    }
@@ -2,11 +2,14 @@
 import logging
 import json
 import redis
+from celery.signals import worker_ready
 from sqlalchemy.orm import Session
 from .celery_app import celery_app
 from ..database import SessionLocal
 from .. import models
 from ..services import generator
+from ..services.encoding import get_profile, PREVIEW_PROFILE
+from ..services.stage_timing import StageTimer
 from ..storage import get_video_path, get_audio_path
 from ..config import settings
 
@@ -16,6 +19,15 @@ logger = logging.getLogger(__name__)
 redis_client = redis.from_url(settings.REDIS_URL)
 
 
+@worker_ready.connect
+def sweep_stale_workspaces(**kwargs):
+    """Remove scratch directories left behind by killed jobs"""
+    from ..services.workspace import get_workspace_manager
+    removed = get_workspace_manager().sweep()
+    if removed:
+        logger.info(f"Removed {removed} stale job workspaces")
+
+
 @celery_app.task(bind=True)
 def generate_scripts_task(self, count: int = 1):
     """Generate scripts asynchronously"""
@@ -29,30 +41,30 @@ def generate_scripts_task(self, count: int = 1):
         
         scripts_data = generator.generate_scripts(db, count)
         
-        # Save to database
-        script_ids = []
-        for i, script_data in enumerate(scripts_data):
-            # Publish progress
-            redis_client.publish(
-                f"progress:{self.request.id}",
-                json.dumps({
-                    "status": f"Saving script {i+1}/{len(scripts_data)}...",
-                    "elapsed": i * 0.5,
-                    "task_id": self.request.id
-                })
-            )
-            
-            db_script = models.Script(
+        # Save to database in one batch
+        redis_client.publish(
+            f"progress:{self.request.id}",
+            json.dumps({
+                "status": f"Saving {len(scripts_data)} scripts...",
+                "elapsed": 0,
+                "task_id": self.request.id
+            })
+        )
+        
+        db_scripts = [
+            models.Script(
                 theme=script_data["theme"],
                 script=script_data["script"],
                 hook=script_data["hook"],
                 caption=script_data["caption"],
                 status="draft"
             )
-            db.add(db_script)
-            db.commit()
-            db.refresh(db_script)
-            script_ids.append(db_script.id)
+            for script_data in scripts_data
+        ]
+        db.add_all(db_scripts)
+        db.flush()  # single multi-row INSERT ... RETURNING id
+        script_ids = [db_script.id for db_script in db_scripts]
+        db.commit()
         
         # Publish completion
         redis_client.publish(
@@ -72,8 +84,8 @@ def generate_scripts_task(self, count: int = 1):
 
 
 @celery_app.task(bind=True)
-def generate_post_text_task(self, script_id: int):
-    """Generate clean post text from script"""
+def generate_post_text_task(self, script_id: int, refresh: bool = False):
+    """Generate clean post text from script (refresh=True bypasses the LLM cache)"""
     db = SessionLocal()
     try:
         script = db.query(models.Script).filter(models.Script.id == script_id).first()
@@ -82,7 +94,7 @@ def generate_post_text_task(self, script_id: int):
             raise ValueError(f"Script {script_id} not found")
         
         # Generate clean text
-        post_text = generator.generate_clean_post(script.script, script.theme, db)
+        post_text = generator.generate_clean_post(script.script, script.theme, db, use_cache=not refresh)
         
         # Update script
         script.post_text = post_text
@@ -95,11 +107,95 @@ def generate_post_text_task(self, script_id: int):
 
 
 @celery_app.task(bind=True)
-def generate_video_task(self, script_id: int, text_position: str = "center", custom_background: str = None, voice_id: str = None):
+def generate_video_task(
+    self,
+    script_id: int,
+    text_position: str = "center",
+    custom_background: str = None,
+    voice_id: str = None,
+    encoding_profile: str = None,
+    preview: bool = False
+):
     """Generate video from script asynchronously with custom settings"""
+    return render_script_video(
+        self.request.id, script_id, text_position, custom_background, voice_id, encoding_profile, preview
+    )
+
+
+@celery_app.task(bind=True)
+def encode_publish_task(
+    self,
+    video_id: int,
+    text: str,
+    background_url: str,
+    audio_path: str,
+    text_position: str,
+    encoding_profile: str
+):
+    """Second tier: publish-quality encode of a video that already has a preview"""
+    from ..services.video_generator import encode_video
+    
+    timer = StageTimer()
+    try:
+        video_url = encode_video(text, background_url, audio_path, text_position, encoding_profile, timer=timer)
+    except Exception as e:
+        logger.error(f"Publish encode failed for video {video_id}: {e}")
+        db = SessionLocal()
+        try:
+            video = db.query(models.Video).filter(models.Video.id == video_id).first()
+            if video:
+                video.error_message = f"Publish encode failed: {e}"
+                timer.save(db, video_id, self.request.id, encoding_profile)
+                db.commit()
+        finally:
+            db.close()
+        raise
+    
     db = SessionLocal()
+    try:
+        video = db.query(models.Video).filter(models.Video.id == video_id).first()
+        if not video:
+            raise ValueError(f"Video {video_id} not found")
+        
+        video.video_path = video_url
+        video.encoding_profile = encoding_profile
+        with timer.span("db_commit"):
+            db.commit()
+        
+        timer.save(db, video_id, self.request.id, encoding_profile)
+        db.commit()
+        
+        logger.info(f"✅ Publish encode ({encoding_profile}) ready for video {video_id}")
+        return {"video_id": video_id, "video_url": video_url, "encoding_profile": encoding_profile}
     
-    logger.info(f"Generating video for script {script_id} with settings: position={text_position}, voice={voice_id}, bg={custom_background is not None}")
+    finally:
+        db.close()
+
+
+def render_script_video(
+    task_id: str,
+    script_id: int,
+    text_position: str = "center",
+    custom_background: str = None,
+    voice_id: str = None,
+    encoding_profile: str = None,
+    preview: bool = False
+) -> dict:
+    """
+    Render a video for a script and record it in the Video table
+
+    Shared by generate_video_task and the automation pipeline. Progress is
+    published on progress:{task_id}.
+
+    With preview=True a fast preview encode is delivered first and the
+    encoding_profile (publish tier) encode is queued as encode_publish_task.
+    """
+    db = SessionLocal()
+    
+    publish_profile = get_profile(encoding_profile).name
+    two_tier = preview and publish_profile != PREVIEW_PROFILE
+    
+    logger.info(f"Generating video for script {script_id} with settings: position={text_position}, voice={voice_id}, bg={custom_background is not None}, profile={publish_profile}, preview={two_tier}")
     
     try:
         # Get script
@@ -126,16 +222,19 @@ def generate_video_task(self, script_id: int, text_position: str = "center", cus
                 "video_id": video_id,
                 "status": status,
                 "elapsed": elapsed,
-                "task_id": self.request.id
+                "task_id": task_id
             }
             redis_client.publish(
-                f"progress:{self.request.id}",
+                f"progress:{task_id}",
                 json.dumps(progress_data)
             )
         
         # Use post_text if available, otherwise use script
         text_for_video = script.post_text if script.post_text else script.script
         
+        # Per-stage durations, stored as VideoStageTiming rows (see /api/metrics)
+        timer = StageTimer()
+        
         # Generate video using SIMPLE generator (frontend settings only)
         try:
             logger.info(f"🎬 ========================================")
@@ -169,39 +268,64 @@ def generate_video_task(self, script_id: int, text_position: str = "center", cus
                 voice_id=voice_id,
                 background_url=custom_background,
                 text_position=text_position,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                encoding_profile=PREVIEW_PROFILE if two_tier else publish_profile,
+                timer=timer
             )
             video.generator = "simple"
             
             # Save file paths
             video.video_path = video_url
             video.audio_path = audio_url
+            video.encoding_profile = PREVIEW_PROFILE if two_tier else publish_profile
+            if two_tier:
+                video.preview_path = video_url
             video.status = "completed"
-            db.commit()
+            with timer.span("db_commit"):
+                db.commit()
+            
+            # Publish-quality encode in the background; the preview is reviewable now
+            publish_task_id = None
+            if two_tier:
+                publish_task_id = encode_publish_task.delay(
+                    video_id, text_for_video, custom_background, audio_url, text_position, publish_profile
+                ).id
             
             # Send Telegram notification
             try:
                 from ..services.telegram_bot import send_video_notification
                 import asyncio
-                asyncio.run(send_video_notification(
-                    video_url,
-                    script.caption or script.hook,
-                    script.script
-                ))
+                with timer.span("telegram"):
+                    asyncio.run(send_video_notification(
+                        video_url,
+                        script.caption or script.hook,
+                        script.script
+                    ))
             except Exception as e:
                 logger.error(f"Error sending Telegram notification: {e}")
             
+            try:
+                timer.save(db, video_id, task_id, video.encoding_profile)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error saving stage timings for video {video_id}: {e}")
+            
             return {
                 "video_id": video_id,
                 "video_url": video_url,
                 "audio_url": audio_url,
+                "encoding_profile": video.encoding_profile,
+                "publish_task_id": publish_task_id,
                 "status": "completed"
             }
         
         except Exception as e:
             logger.error(f"Error generating video: {e}")
+            db.rollback()
             video.status = "failed"
             video.error_message = str(e)
+            timer.save(db, video_id, task_id, publish_profile)
             db.commit()
             raise
     
@@ -0,0 +1 @@
+"""Render benchmarks (run from backend/: python -m benchmarks.render_bench)"""
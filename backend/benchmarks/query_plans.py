@@ -0,0 +1,184 @@
+"""
+Query plan regression check for the automation hot queries
+
+Seeds a scratch database with a large, realistically skewed history
+(mostly published posts and INFO logs, a small pending / unnotified slice),
+runs EXPLAIN on each periodic-task and status query and fails if any of them
+falls back to a full scan of its table.
+
+Usage (from backend/):
+    python -m benchmarks.query_plans                          # temporary SQLite file
+    python -m benchmarks.query_plans --database-url postgresql://localhost/allaboutme_plans
+    python -m benchmarks.query_plans --posts 500000 --logs 1000000
+
+Only point --database-url at a scratch database: rows are inserted into it.
+Exit status is 1 when a query regressed to a full scan.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def seed(db, posts: int, logs: int):
+    from app.models_extended import AutomationLog, ScheduledPost
+
+    rng = random.Random(42)
+    now = datetime.now()
+    batch = 10000
+
+    started = time.perf_counter()
+    for offset in range(0, posts, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, posts)):
+            scheduled = now - timedelta(minutes=5 * (posts - i))
+            roll = rng.random()
+            if i >= posts - 50:
+                status = "pending"  # today's schedule, partly due
+                scheduled = now + timedelta(minutes=10 * (i - posts + 25))
+            elif roll < 0.9:
+                status = "published"
+            elif roll < 0.97:
+                status = "failed"
+            else:
+                status = "generated"
+            rows.append({
+                "script_id": i,
+                "scheduled_time": scheduled,
+                "status": status,
+                "published_at": scheduled + timedelta(minutes=3) if status == "published" else None,
+                "caption": "caption",
+            })
+        db.bulk_insert_mappings(ScheduledPost, rows)
+        db.commit()
+
+    for offset in range(0, logs, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, logs)):
+            roll = rng.random()
+            level = "INFO" if roll < 0.85 else "WARNING" if roll < 0.95 else "ERROR"
+            rows.append({
+                "level": level,
+                "message": "message",
+                "notified": not (level == "ERROR" and i >= logs - 200),
+                "created_at": now - timedelta(seconds=30 * (logs - i)),
+            })
+        db.bulk_insert_mappings(AutomationLog, rows)
+        db.commit()
+
+    print(f"Seeded {posts} scheduled_posts and {logs} automation_logs in {time.perf_counter() - started:.1f}s")
+
+
+def hot_queries(db) -> dict:
+    """The periodic-task and /api/automation queries, from the builders the app uses"""
+    from sqlalchemy import func, select
+
+    from app.services import scheduler_service
+
+    def count(query):
+        # What Query.count() runs
+        return select(func.count()).select_from(query.subquery())
+
+    return {
+        # process_pending_posts_task / schedule creation
+        "pending_posts": ("scheduled_posts", scheduler_service.pending_posts_query(db, 20)),
+        # /api/automation/status
+        "pending_count": ("scheduled_posts", count(scheduler_service.pending_count_query(db))),
+        "published_today": ("scheduled_posts", count(scheduler_service.published_today_query(db))),
+        # check_and_notify_errors_task
+        "unnotified_errors": ("automation_logs", scheduler_service.unnotified_errors_query(db)),
+        # /api/automation/logs?level=ERROR
+        "error_logs": ("automation_logs", scheduler_service.automation_logs_query(db, "ERROR")),
+    }
+
+
+def explain(db, query) -> tuple[list, list]:
+    """(plan lines, tables scanned in full)"""
+    statement = getattr(query, "statement", query)
+    sql = str(statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+
+    if db.bind.dialect.name == "postgresql":
+        plan = db.execute(_text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lines, full_scans = [], []
+
+        def walk(node, depth=0):
+            relation = node.get("Relation Name")
+            index = node.get("Index Name")
+            lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "") + (f" using {index}" if index else ""))
+            if node["Node Type"] == "Seq Scan":
+                full_scans.append(relation)
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        return lines, full_scans
+
+    rows = db.execute(_text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    lines = [row[-1] for row in rows]
+    # "SCAN t" without "USING ... INDEX" reads every row of t
+    full_scans = [line.split()[1] for line in lines if line.startswith("SCAN ") and " INDEX " not in line]
+    return lines, full_scans
+
+
+def _text(sql: str):
+    from sqlalchemy import text
+    return text(sql)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check automation query plans against a seeded dataset")
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--posts", type=int, default=200000)
+    parser.add_argument("--logs", type=int, default=300000)
+    args = parser.parse_args()
+
+    scratch = None
+    if not args.database_url:
+        scratch = Path(tempfile.mkdtemp(prefix="allaboutme_plans_")) / "plans.db"
+        args.database_url = f"sqlite:///{scratch}"
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import Base, SessionLocal, engine
+    from app import models, models_extended  # noqa: F401 - register tables
+
+    # Tables and the indexes declared in __table_args__ (what create_all / the migrations build)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if not db.query(models_extended.ScheduledPost.id).first():
+            seed(db, args.posts, args.logs)
+        db.execute(_text("ANALYZE"))
+        db.commit()
+
+        regressions = []
+        for name, (table, query) in hot_queries(db).items():
+            lines, full_scans = explain(db, query)
+            status = "FULL SCAN" if table in full_scans else "ok"
+            print(f"\n[{status}] {name}")
+            for line in lines:
+                print(f"    {line}")
+            if table in full_scans:
+                regressions.append(name)
+    finally:
+        db.close()
+        if scratch:
+            scratch.unlink(missing_ok=True)
+            scratch.parent.rmdir()
+
+    if regressions:
+        print(f"\n❌ Full table scans: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ All hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
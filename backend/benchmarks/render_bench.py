@@ -0,0 +1,263 @@
+"""
+Video rendering benchmark
+
+Renders fixed-length scripts (15/30/60 s by default) against generated
+backgrounds and a local tone track, stage by stage:
+
+    background   decode + scale + crop into the background cache (cold)
+    audio_probe  duration probe
+    subtitles    cue timing (energy segmenter on the tone track)
+    encode       compositor.render_video for the encoding profile
+    create_video full create_video() call (warm caches, honours VIDEO_RENDERER)
+
+Every case runs in a fresh process so peak RSS is per case. Results are
+written as JSON for comparison across commits.
+
+Usage (from backend/):
+    python -m benchmarks.render_bench --output bench.json
+    python -m benchmarks.render_bench --durations 15 --profiles preview --repeat 3
+    python -m benchmarks.render_bench --renderer moviepy --output moviepy.json
+    python -m benchmarks.render_bench --compare base.json bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import fixtures
+
+STAGES = ["background", "audio_probe", "subtitles", "encode", "create_video"]
+
+
+def _peak_rss_mb() -> tuple[float, float]:
+    """Peak RSS of this process and of its largest waited child (ffmpeg)"""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on macOS, KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 1024 / 1024
+    return round(own, 1), round(children, 1)
+
+
+class _Stage:
+    def __init__(self, results: dict, name: str):
+        self.results = results
+        self.name = name
+        self.extra = {}
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        own, children = _peak_rss_mb()
+        self.results[self.name] = {
+            "wall_s": round(time.perf_counter() - self.started, 4),
+            "peak_rss_mb": own,
+            "children_peak_rss_mb": children,
+            **self.extra,
+        }
+        return False
+
+
+def run_case(case: dict) -> dict:
+    """One render in a fresh process; case holds paths, profile and renderer"""
+    # Private storage so the background cache and workspaces start cold
+    os.environ["STORAGE_PATH"] = case["storage"]
+    os.environ["VIDEO_RENDERER"] = case["renderer"]
+    os.environ["RENDER_POOL"] = "false"
+
+    from app.services import compositor, video_generator
+    from app.services.background_cache import get_background_cache
+    from app.services.encoding import get_profile
+    from app.services.subtitles import sidecar_path
+
+    background_path = Path(case["background"])
+    audio_path = Path(case["audio"])
+    text = case["script"]
+    profile = get_profile(case["profile"])
+    output_path = Path(case["storage"]) / f"encode_{profile.name}.mp4"
+    sidecar_path(audio_path).unlink(missing_ok=True)
+
+    stages = {}
+    with _Stage(stages, "background"):
+        frame = get_background_cache().load(background_path)
+
+    with _Stage(stages, "audio_probe"):
+        duration = compositor.probe_duration(audio_path)
+
+    with _Stage(stages, "subtitles") as stage:
+        cues = video_generator.subtitle_cues(text, audio_path, duration)
+        stage.extra["cues"] = len(cues)
+
+    with _Stage(stages, "encode") as stage:
+        compositor.render_video(
+            background_path=background_path,
+            audio_path=audio_path,
+            cues=cues,
+            output_path=output_path,
+            duration=duration,
+            background=frame,
+            profile=profile
+        )
+        frames = int(duration * profile.fps + 0.999)
+        stage.extra.update(frames=frames, output_bytes=output_path.stat().st_size)
+    stages["encode"]["fps"] = round(frames / stages["encode"]["wall_s"], 1)
+
+    with _Stage(stages, "create_video") as stage:
+        video_path, _ = video_generator.create_video(
+            text=text,
+            background_path=background_path,
+            audio_path=audio_path,
+            encoding_profile=profile.name
+        )
+        stage.extra.update(frames=frames, output_bytes=video_path.stat().st_size)
+    stages["create_video"]["fps"] = round(frames / stages["create_video"]["wall_s"], 1)
+    video_path.unlink(missing_ok=True)
+    sidecar_path(audio_path).unlink(missing_ok=True)
+
+    return stages
+
+
+def _merge_runs(runs: list[dict]) -> dict:
+    """Median wall time / fps over repeats, worst peak RSS"""
+    merged = {}
+    for name in STAGES:
+        samples = [run[name] for run in runs if name in run]
+        if not samples:
+            continue
+        stage = dict(samples[-1])
+        stage["wall_s"] = round(statistics.median(s["wall_s"] for s in samples), 4)
+        stage["wall_s_all"] = [s["wall_s"] for s in samples]
+        stage["peak_rss_mb"] = max(s["peak_rss_mb"] for s in samples)
+        stage["children_peak_rss_mb"] = max(s["children_peak_rss_mb"] for s in samples)
+        if "fps" in stage:
+            stage["fps"] = round(statistics.median(s["fps"] for s in samples), 1)
+        merged[name] = stage
+    return merged
+
+
+def _git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def run(args) -> dict:
+    workdir = Path(args.workdir)
+    data = fixtures.prepare(workdir / "fixtures", args.durations, tone=not args.silent)
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for duration in args.durations:
+        for profile in args.profiles:
+            runs = []
+            for attempt in range(args.repeat):
+                storage = tempfile.mkdtemp(prefix=f"bench_{duration}s_{profile}_", dir=workdir)
+                case = {
+                    "storage": storage,
+                    "renderer": args.renderer,
+                    "background": str(data["backgrounds"][args.background]),
+                    "audio": str(data["audio"][duration]),
+                    "script": data["scripts"][duration],
+                    "profile": profile,
+                }
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    runs.append(pool.submit(run_case, case).result())
+                subprocess.run(["rm", "-rf", storage], check=False)
+
+            stages = _merge_runs(runs)
+            results.append({"duration_s": duration, "profile": profile, "stages": stages})
+            print(
+                f"{duration:>4}s {profile:<18} encode {stages['encode']['wall_s']:7.2f}s "
+                f"({stages['encode']['fps']:6.1f} fps)  create_video {stages['create_video']['wall_s']:7.2f}s  "
+                f"rss {stages['create_video']['peak_rss_mb']:.0f} MB (+ffmpeg {stages['create_video']['children_peak_rss_mb']:.0f} MB)  "
+                f"{stages['create_video']['output_bytes'] / 1024 / 1024:.1f} MB",
+                flush=True
+            )
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git": _git_revision(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "durations": args.durations,
+            "profiles": args.profiles,
+            "background": args.background,
+            "renderer": args.renderer,
+            "repeat": args.repeat,
+            "audio": "silent" if args.silent else "tone",
+        },
+        "results": results,
+    }
+
+
+def compare(base_path: Path, new_path: Path):
+    """Print per-stage wall time change between two result files"""
+    base = json.loads(base_path.read_text())
+    new = json.loads(new_path.read_text())
+    base_cases = {(r["duration_s"], r["profile"]): r["stages"] for r in base["results"]}
+
+    print(f"base {base['git'].get('commit')}  →  new {new['git'].get('commit')}")
+    for result in new["results"]:
+        key = (result["duration_s"], result["profile"])
+        if key not in base_cases:
+            continue
+        print(f"{key[0]:>4}s {key[1]}")
+        for name in STAGES:
+            old_stage, new_stage = base_cases[key].get(name), result["stages"].get(name)
+            if not old_stage or not new_stage:
+                continue
+            change = (new_stage["wall_s"] - old_stage["wall_s"]) / old_stage["wall_s"] * 100 if old_stage["wall_s"] else 0.0
+            print(
+                f"    {name:<13} {old_stage['wall_s']:8.3f}s → {new_stage['wall_s']:8.3f}s  {change:+6.1f}%  "
+                f"rss {old_stage['peak_rss_mb']:.0f} → {new_stage['peak_rss_mb']:.0f} MB"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark video rendering")
+    parser.add_argument("--durations", type=int, nargs="+", default=[15, 30, 60])
+    parser.add_argument("--profiles", nargs="+", default=["preview", "publish"])
+    parser.add_argument("--background", choices=sorted(fixtures.BACKGROUNDS), default="landscape")
+    parser.add_argument("--renderer", choices=["native", "moviepy"], default="native")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--silent", action="store_true", help="silent audio instead of the tone track")
+    parser.add_argument("--workdir", default=str(Path(tempfile.gettempdir()) / "allaboutme_bench"))
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(Path(args.compare[0]), Path(args.compare[1]))
+        return
+
+    report = run(args)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
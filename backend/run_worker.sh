@@ -0,0 +1,49 @@
+#!/bin/bash
+# Start a Celery worker for one group of queues.
+#
+#   ./run_worker.sh render   # render dispatcher feeding the warm render process pool
+#   ./run_worker.sh io       # threaded pool for llm + publish + automation
+#   ./run_worker.sh beat     # periodic task scheduler (run exactly one)
+#   ./run_worker.sh all      # everything in one worker (local development)
+#
+# Overrides: RENDER_CONCURRENCY, IO_CONCURRENCY, RENDER_POOL_SIZE, CELERY_LOGLEVEL
+
+set -e
+cd "$(dirname "$0")"
+
+LOGLEVEL="${CELERY_LOGLEVEL:-info}"
+# nproc reports the host's cores inside a container, so size render
+# concurrency from explicit settings only (2 by default, like the single worker)
+RENDER_DEFAULT=2
+
+case "${1:-all}" in
+    render)
+        # Task threads only dispatch; frames are rendered by RENDER_POOL_SIZE
+        # warm processes (app/services/render_pool.py). Raise both together
+        # to the cores and memory actually available (~150 MB+ per renderer).
+        export RENDER_POOL_SIZE="${RENDER_POOL_SIZE:-$RENDER_DEFAULT}"
+        echo "🎬 Render worker: ${RENDER_CONCURRENCY:-$RENDER_DEFAULT} dispatch threads, $RENDER_POOL_SIZE renderers"
+        exec celery -A app.tasks.celery_app worker -Q render -n "render@%h" \
+            --pool=threads --concurrency="${RENDER_CONCURRENCY:-$RENDER_DEFAULT}" \
+            --prefetch-multiplier=1 --loglevel="$LOGLEVEL"
+        ;;
+    io)
+        echo "🌐 I/O worker: ${IO_CONCURRENCY:-32} threads"
+        exec celery -A app.tasks.celery_app worker -Q llm,publish,automation,celery -n "io@%h" \
+            --pool=threads --concurrency="${IO_CONCURRENCY:-32}" \
+            --prefetch-multiplier=4 --loglevel="$LOGLEVEL"
+        ;;
+    beat)
+        echo "⏰ Celery beat"
+        exec celery -A app.tasks.celery_app beat --loglevel="$LOGLEVEL"
+        ;;
+    all)
+        echo "🔄 Single worker for all queues with beat"
+        exec celery -A app.tasks.celery_app worker --beat -Q celery,llm,render,publish,automation \
+            --concurrency="${RENDER_CONCURRENCY:-$RENDER_DEFAULT}" --loglevel="$LOGLEVEL"
+        ;;
+    *)
+        echo "Usage: $0 {render|io|beat|all}"
+        exit 1
+        ;;
+esac
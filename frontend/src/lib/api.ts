@@ -188,13 +188,17 @@ export class APIClient {
 		scriptId: number, 
 		textPosition: string = 'center', 
 		customBackground?: string,
-		voiceId?: string
+		voiceId?: string,
+		encodingProfile: string = 'publish',
+		preview: boolean = true
 	) {
 		const payload = { 
 			script_id: scriptId,
 			text_position: textPosition,
 			custom_background: customBackground,
-			voice_id: voiceId
+			voice_id: voiceId,
+			encoding_profile: encodingProfile,
+			preview
 		};
 		
 		console.log('[API] 🎬 generateVideo called with:', payload);
@@ -8,6 +8,7 @@ export interface ProgressUpdate {
 	elapsed: number;
 	task_id: string;
 	progress?: number;
+	type?: string;
 }
 
 export function connectProgress(
@@ -25,6 +26,10 @@ export function connectProgress(
 	ws.onmessage = (event) => {
 		try {
 			const data = JSON.parse(event.data);
+
+			// Server heartbeat, not a progress update
+			if (data.type === 'ping') return;
+
 			onUpdate(data);
 
 			// Auto-close on completion or failure
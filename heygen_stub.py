@@ -0,0 +1,104 @@
+"""
+Локальная заглушка HeyGen API для офлайн-тестов renderer.py.
+
+Эмулирует создание видео и video_status.get; видео "рендерится"
+STUB_SECONDS_PER_WORD секунд на слово. Если задан STUB_WEBHOOK_URL,
+по завершении отправляется вебхук как от настоящего HeyGen.
+
+Запуск:
+    python heygen_stub.py
+    HEYGEN_API_BASE=http://127.0.0.1:8091 HEYGEN_TEMPLATE_ID=stub python main.py
+
+GET /stub/stats показывает, сколько запросов статуса пришло.
+"""
+import asyncio
+import os
+import time
+import uuid
+
+import requests
+from fastapi import FastAPI, Request
+
+STUB_PORT = int(os.getenv("STUB_PORT", "8091"))
+STUB_SECONDS_PER_WORD = float(os.getenv("STUB_SECONDS_PER_WORD", "0.5"))
+STUB_FAIL_WORD = os.getenv("STUB_FAIL_WORD", "FAIL")  # сценарий с этим словом завершится ошибкой
+STUB_WEBHOOK_URL = os.getenv("STUB_WEBHOOK_URL", "")
+
+app = FastAPI(title="HeyGen stub")
+
+videos = {}  # video_id -> dict(ready_at, failed)
+stats = {"created": 0, "status_requests": 0, "webhooks_sent": 0}
+
+
+def _script_text(payload: dict) -> str:
+    """Текст сценария из template- или direct-payload."""
+    variables = payload.get("variables", {})
+    if "LLM_bulletin" in variables:
+        return variables["LLM_bulletin"].get("properties", {}).get("content", "")
+    inputs = payload.get("video_inputs", [])
+    return inputs[0].get("voice", {}).get("input_text", "") if inputs else ""
+
+
+def _send_webhook(video_id: str):
+    video = videos[video_id]
+    if video["failed"]:
+        event = {"event_type": "avatar_video.fail", "event_data": {"video_id": video_id, "msg": "stub failure"}}
+    else:
+        event = {"event_type": "avatar_video.success", "event_data": {"video_id": video_id, "url": video["url"]}}
+    try:
+        requests.post(STUB_WEBHOOK_URL, json=event, timeout=10)
+        stats["webhooks_sent"] += 1
+    except requests.RequestException as e:
+        print(f"⚠️ Вебхук не доставлен: {e}")
+
+
+async def _create(request: Request) -> dict:
+    script = _script_text(await request.json())
+    video_id = uuid.uuid4().hex
+    render_seconds = max(1.0, len(script.split()) * STUB_SECONDS_PER_WORD)
+    videos[video_id] = {
+        "ready_at": time.time() + render_seconds,
+        "failed": STUB_FAIL_WORD in script,
+        "url": f"http://127.0.0.1:{STUB_PORT}/videos/{video_id}.mp4"
+    }
+    stats["created"] += 1
+    
+    if STUB_WEBHOOK_URL:
+        loop = asyncio.get_running_loop()
+        loop.call_later(render_seconds, lambda: loop.run_in_executor(None, _send_webhook, video_id))
+    
+    return {"error": None, "data": {"video_id": video_id}}
+
+
+@app.post("/v2/template/{template_id}/generate")
+async def generate_from_template(template_id: str, request: Request):
+    return await _create(request)
+
+
+@app.post("/v2/video/generate")
+async def generate_direct(request: Request):
+    return await _create(request)
+
+
+@app.get("/v1/video_status.get")
+async def video_status(video_id: str):
+    stats["status_requests"] += 1
+    video = videos.get(video_id)
+    if not video:
+        return {"code": 404, "data": {"status": "failed", "error": "video not found"}}
+    
+    if time.time() < video["ready_at"]:
+        return {"code": 100, "data": {"status": "processing"}}
+    if video["failed"]:
+        return {"code": 100, "data": {"status": "failed", "error": "stub failure"}}
+    return {"code": 100, "data": {"status": "completed", "video_url": video["url"]}}
+
+
+@app.get("/stub/stats")
+async def stub_stats():
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=STUB_PORT)
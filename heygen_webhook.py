@@ -0,0 +1,77 @@
+"""
+Приём вебхуков HeyGen о завершении рендера.
+
+HeyGen вызывает этот endpoint, как только видео готово, и ожидание в
+renderer.poller завершается сразу, без очередного опроса статуса.
+
+Сервер должен жить в том же процессе, что и renderer.poller: его запускает
+сам поллер при первом watch(), если задан HEYGEN_WEBHOOK_PORT. Отдельный
+процесс не видит отслеживаемых видео, поэтому standalone-запуска нет.
+
+Адрес (https://<host>/heygen/webhook) регистрируется в HeyGen как webhook
+endpoint для событий avatar_video.success / avatar_video.fail.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import threading
+
+from fastapi import FastAPI, Header, HTTPException, Request
+
+import renderer
+
+logger = logging.getLogger(__name__)
+
+HEYGEN_WEBHOOK_SECRET = os.getenv("HEYGEN_WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("HEYGEN_WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("HEYGEN_WEBHOOK_PORT", "8090"))
+
+app = FastAPI(title="HeyGen webhook")
+
+
+def _verify_signature(body: bytes, signature: str):
+    """Проверка HMAC-SHA256 подписи, если задан HEYGEN_WEBHOOK_SECRET."""
+    if not HEYGEN_WEBHOOK_SECRET:
+        return
+    expected = hmac.new(HEYGEN_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not signature or not hmac.compare_digest(expected, signature):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+
+@app.post("/heygen/webhook")
+async def heygen_webhook(request: Request, signature: str = Header(default="")):
+    body = await request.body()
+    _verify_signature(body, signature)
+    
+    payload = await request.json()
+    event_type = payload.get("event_type", "")
+    event_data = payload.get("event_data", {})
+    video_id = event_data.get("video_id")
+    
+    if not video_id:
+        raise HTTPException(status_code=400, detail="video_id missing")
+    
+    if event_type == "avatar_video.success":
+        tracked = renderer.poller.notify(
+            video_id, "completed", video_url=event_data.get("url") or event_data.get("video_url")
+        )
+    elif event_type == "avatar_video.fail":
+        tracked = renderer.poller.notify(video_id, "failed", error=event_data.get("msg") or event_data.get("error"))
+    else:
+        logger.info(f"Пропускаем событие HeyGen {event_type}")
+        return {"status": "ignored"}
+    
+    logger.info(f"📨 Вебхук HeyGen {event_type} для {video_id} (отслеживалось: {tracked})")
+    return {"status": "ok", "tracked": tracked}
+
+
+def start_webhook_server(host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> threading.Thread:
+    """Поднять сервер вебхуков в фоновом потоке текущего процесса."""
+    import uvicorn
+    
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="heygen-webhook", daemon=True)
+    thread.start()
+    logger.info(f"✅ HeyGen webhook слушает http://{host}:{port}/heygen/webhook")
+    return thread
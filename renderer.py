@@ -1,4 +1,5 @@
-import os, time, requests, json, logging
+import os, time, requests, json, logging, asyncio, threading, random
+import concurrent.futures
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,9 +14,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _heygen_guard():
+    """
+    Общий Redis-лимитер backend (backend/app/services/rate_limiter.py) для HeyGen.
+    
+    Если backend рядом нет (или нет его зависимостей) - вызовы идут без ограничений.
+    """
+    try:
+        import sys
+        backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+        if os.path.isdir(backend_dir) and backend_dir not in sys.path:
+            sys.path.append(backend_dir)
+        from app.services.rate_limiter import guard
+        return guard("heygen")
+    except ImportError:
+        import contextlib
+        return contextlib.nullcontext()
+
 HEYGEN_API_KEY = os.getenv("HEYGEN_API_KEY")
 HEYGEN_AVATAR_ID = os.getenv("HEYGEN_AVATAR_ID", "")
 HEYGEN_TEMPLATE_ID = os.getenv("HEYGEN_TEMPLATE_ID", "")  # Рекомендуется для template-based
+HEYGEN_API_BASE = os.getenv("HEYGEN_API_BASE", "https://api.heygen.com").rstrip("/")  # heygen_stub.py для офлайн-тестов
 
 # HeyGen работает ЛУЧШЕ с templates, чем с direct generation
 USE_TEMPLATE_MODE = bool(HEYGEN_TEMPLATE_ID)
@@ -93,18 +113,19 @@ def _submit_via_template(script: str, headers: dict) -> str:
         "variables": variables
     }
     
-    url = f"https://api.heygen.com/v2/template/{HEYGEN_TEMPLATE_ID}/generate"
+    url = f"{HEYGEN_API_BASE}/v2/template/{HEYGEN_TEMPLATE_ID}/generate"
     
     logger.info(f"🚀 POST {url}")
     logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
     
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=60)
-        
-        logger.info(f"📊 Статус: {r.status_code}")
-        logger.debug(f"Ответ: {r.text}")
-        
-        r.raise_for_status()
+        with _heygen_guard():
+            r = requests.post(url, headers=headers, json=payload, timeout=60)
+            
+            logger.info(f"📊 Статус: {r.status_code}")
+            logger.debug(f"Ответ: {r.text}")
+            
+            r.raise_for_status()
         
         response_data = r.json()
         video_id = response_data.get("data", {}).get("video_id")
@@ -185,8 +206,8 @@ def _submit_direct(script: str, headers: dict) -> str:
     
     # Список endpoints для попытки (fallback)
     endpoints_to_try = [
-        "https://api.heygen.com/v2/videos",  # Новый CREATE endpoint
-        "https://api.heygen.com/v2/video/generate",  # Старый generate
+        f"{HEYGEN_API_BASE}/v2/videos",  # Новый CREATE endpoint
+        f"{HEYGEN_API_BASE}/v2/video/generate",  # Старый generate
     ]
     
     last_error = None
@@ -198,11 +219,16 @@ def _submit_direct(script: str, headers: dict) -> str:
             logger.debug(f"Headers: {headers}")
             logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
             
-            r = requests.post(url, headers=headers, json=payload, timeout=60)
-            
-            # Детальное логирование ответа
-            logger.info(f"Статус код: {r.status_code}")
-            logger.debug(f"Ответ: {r.text}")
+            with _heygen_guard():
+                r = requests.post(url, headers=headers, json=payload, timeout=60)
+                
+                # Детальное логирование ответа
+                logger.info(f"Статус код: {r.status_code}")
+                logger.debug(f"Ответ: {r.text}")
+                
+                # 429/5xx засчитываются лимитером как сбой провайдера
+                if r.status_code != 404:
+                    r.raise_for_status()
             
             # Если 404 - пробуем следующий endpoint
             if r.status_code == 404:
@@ -210,8 +236,6 @@ def _submit_direct(script: str, headers: dict) -> str:
                 last_error = f"404 для {url}"
                 continue
             
-            r.raise_for_status()
-            
             response_data = r.json()
             
             # Пробуем разные варианты получения video_id
@@ -261,61 +285,347 @@ def _submit_direct(script: str, headers: dict) -> str:
     
     raise RuntimeError(error_msg)
 
-def wait_video(video_id: str, timeout=900, progress_callback=None) -> str:
-    """Ждёт готовности видео и возвращает прямой URL."""
-    status_url = f"https://api.heygen.com/v1/video_status.get?video_id={video_id}"
-    
+HEYGEN_STATUS_URL = f"{HEYGEN_API_BASE}/v1/video_status.get"
+POLL_TICK = 1  # секунд между проходами цикла поллера
+POLL_CONCURRENCY = 20  # одновременных запросов статуса
+BACKOFF_MIN = 5  # минимальный интервал между проверками одного видео
+BACKOFF_MAX = 120  # максимальный интервал
+BACKOFF_JITTER = 0.2  # ±20%
+WAIT_MARGIN = 60  # запас wait_video сверх timeout, если поллер не успел завершить Future
+HEYGEN_WEBHOOK_PORT = os.getenv("HEYGEN_WEBHOOK_PORT", "")  # задан - вебхук поднимается вместе с поллером
+DEFAULT_RENDER_SECONDS = 120  # ожидаемая длительность рендера без истории
+HISTORY_PATH = os.getenv("HEYGEN_HISTORY_PATH", "heygen_history.json")
+HISTORY_SIZE = 50  # сколько последних длительностей хранить на бакет
+
+
+class HeygenRenderError(RuntimeError):
+    """HeyGen сообщил об ошибке рендеринга."""
+
+
+def check_video_status(video_id: str) -> dict:
+    """Один запрос статуса: {"status", "video_url", "error"}."""
     headers = {
         "X-Api-Key": HEYGEN_API_KEY,
         "Content-Type": "application/json"
     }
+    with _heygen_guard():
+        r = requests.get(HEYGEN_STATUS_URL, params={"video_id": video_id}, headers=headers, timeout=30)
+        r.raise_for_status()
+    
+    data = r.json().get("data", {})
+    return {
+        "status": data.get("status", "unknown"),
+        "video_url": data.get("video_url") or data.get("url"),
+        "error": data.get("error")
+    }
+
+
+class RenderHistory:
+    """
+    История длительностей рендера HeyGen по длине сценария.
+    
+    Сценарии раскладываются по бакетам количества слов; медиана бакета
+    задаёт, когда имеет смысл впервые спрашивать статус.
+    """
     
-    logger.info(f"Ожидание рендеринга видео {video_id}...")
+    BUCKETS = (50, 100, 200, 400)  # верхние границы в словах
     
-    start_time = time.time()
-    check_interval = 10  # проверяем каждые 10 секунд
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
     
-    for iteration in range(timeout // check_interval):
+    def _load(self) -> dict:
         try:
-            r = requests.get(status_url, headers=headers, timeout=30)
-            r.raise_for_status()
-            
-            response = r.json()
-            data = response.get("data", {})
-            status = data.get("status", "unknown")
-            
-            elapsed = int(time.time() - start_time)
-            logger.info(f"Статус видео [{elapsed}s]: {status}")
-            
-            # Вызываем callback для UI
-            if progress_callback:
-                progress_callback(status, elapsed)
-            
-            if status == "completed":
-                video_url = data.get("video_url") or data.get("url")
-                if video_url:
-                logger.info(f"✅ Видео готово: {video_url}")
-                return video_url
-                else:
-                    logger.error(f"❌ Видео завершено, но URL не найден: {data}")
-                    raise ValueError("Video completed but no URL provided")
-                
-            if status == "failed":
-                error_msg = data.get("error", "Unknown error")
-                logger.error(f"❌ HeyGen сообщил об ошибке: {error_msg}")
-                raise RuntimeError(f"HeyGen failed: {error_msg}")
-            
-            # Продолжаем ждать
-            time.sleep(check_interval)
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    @classmethod
+    def bucket(cls, script_length: int) -> str:
+        for limit in cls.BUCKETS:
+            if script_length <= limit:
+                return f"<={limit}"
+        return f">{cls.BUCKETS[-1]}"
+    
+    def expected(self, script_length: int) -> float:
+        """Медианная длительность рендера для такой длины сценария."""
+        with self._lock:
+            durations = sorted(self._data.get(self.bucket(script_length), []))
+        if not durations:
+            return DEFAULT_RENDER_SECONDS
+        return durations[len(durations) // 2]
+    
+    def record(self, script_length: int, duration: float):
+        with self._lock:
+            durations = self._data.setdefault(self.bucket(script_length), [])
+            durations.append(round(duration, 1))
+            del durations[:-HISTORY_SIZE]
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить историю рендеров: {e}")
+
+
+class HeygenPoller:
+    """
+    Один фоновый цикл, который отслеживает все незавершённые HeyGen видео.
+    
+    submit_to_heygen() возвращается сразу, а watch() регистрирует video_id и
+    возвращает Future, который завершится с URL видео (или ошибкой). Ожидание
+    не держит поток на каждое видео, поэтому один процесс может отслеживать
+    сотни удалённых рендеров.
+    
+    Первая проверка статуса происходит около ожидаемого времени готовности
+    (по истории рендеров), дальше интервал растёт экспоненциально с джиттером.
+    Вебхук HeyGen (heygen_webhook.py) завершает ожидание сразу через notify();
+    его сервер стартует в этом же процессе при первом watch(), иначе notify()
+    не увидел бы отслеживаемых видео.
+    """
+    
+    def __init__(self, tick: float = POLL_TICK, concurrency: int = POLL_CONCURRENCY,
+                 history: RenderHistory = None):
+        self.tick = tick
+        self.concurrency = concurrency
+        self.history = history or RenderHistory()
+        self.status_requests = 0
+        self._jobs = {}  # video_id -> dict(future, started, deadline, next_check, attempt, ...)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._webhook_started = False
+    
+    def _ensure_webhook(self):
+        """Поднять сервер вебхуков в процессе поллера (один раз), если задан HEYGEN_WEBHOOK_PORT."""
+        with self._lock:
+            if self._webhook_started or not HEYGEN_WEBHOOK_PORT:
+                return
+            self._webhook_started = True
+        try:
+            from heygen_webhook import start_webhook_server
+            start_webhook_server(port=int(HEYGEN_WEBHOOK_PORT))
+        except Exception as e:
+            logger.warning(f"⚠️ Вебхук HeyGen не запущен, только опрос статуса: {e}")
+    
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            # Каждый поток владеет своим циклом: завершающийся старый поток
+            # не должен закрыть цикл нового
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, args=(loop,), name="heygen-poller", daemon=True)
+            self._thread.start()
+    
+    def _run(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._poll_forever())
+        except BaseException as e:
+            logger.exception(f"❌ Цикл поллера HeyGen упал: {e}")
+            self._fail_all(RuntimeError(f"HeyGen poller crashed: {e}"))
+        finally:
+            loop.close()
+    
+    def _fail_all(self, error: Exception):
+        """Завершить все ожидания ошибкой и сбросить поток - watch() запустит новый."""
+        with self._lock:
+            if self._thread is not threading.current_thread():
+                # Задачи уже обслуживает новый поток
+                return
+            jobs, self._jobs = self._jobs, {}
+            self._thread = None
+        for job in jobs.values():
+            if not job["future"].done():
+                job["future"].set_exception(error)
+    
+    def _backoff(self, job: dict) -> float:
+        """Следующий интервал: от ожидаемого остатка, удваивается с каждой попыткой."""
+        base = max(BACKOFF_MIN, job["expected"] / 4)
+        delay = min(BACKOFF_MAX, base * (2 ** job["attempt"]))
+        return delay * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
+    
+    def watch(self, video_id: str, timeout: float = 900, progress_callback=None,
+              on_done=None, script_length: int = 0) -> concurrent.futures.Future:
+        """
+        Поставить video_id на отслеживание.
+        
+        Args:
+            video_id: ID видео HeyGen
+            timeout: Максимальное время ожидания в секундах
+            progress_callback: callback(status, elapsed) при каждой проверке
+            on_done: callback(future) когда видео готово или упало
+            script_length: Длина сценария в словах (для прогноза времени рендера)
+        
+        Returns:
+            Future с URL готового видео
+        """
+        with self._lock:
+            job = self._jobs.get(video_id)
+            if job is None:
+                now = time.time()
+                expected = self.history.expected(script_length)
+                job = {
+                    "future": concurrent.futures.Future(),
+                    "started": now,
+                    "deadline": now + timeout,
+                    "expected": expected,
+                    "next_check": now + max(BACKOFF_MIN, expected * 0.8),
+                    "attempt": 0,
+                    "script_length": script_length,
+                    "progress_callback": progress_callback
+                }
+                self._jobs[video_id] = job
+                logger.info(f"Ожидание рендеринга видео {video_id} (ожидается ~{int(expected)}s)...")
+        
+        if on_done:
+            job["future"].add_done_callback(on_done)
+        
+        self._ensure_webhook()
+        self._ensure_running()
+        return job["future"]
+    
+    def notify(self, video_id: str, status: str, video_url: str = None, error: str = None) -> bool:
+        """
+        Внешнее уведомление о завершении (вебхук). Возвращает True, если видео отслеживалось.
+        """
+        with self._lock:
+            tracked = video_id in self._jobs
+        if not tracked:
+            return False
+        
+        self._handle_result(video_id, {"status": status, "video_url": video_url, "error": error})
+        return True
+    
+    def pending(self) -> list:
+        with self._lock:
+            return list(self._jobs)
+    
+    async def _poll_forever(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            now = time.time()
+            with self._lock:
+                if not self._jobs:
+                    # Нечего отслеживать - останавливаем цикл, watch() запустит заново
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                    return
+                due = [
+                    video_id for video_id, job in self._jobs.items()
+                    if job["next_check"] <= now or job["deadline"] <= now
+                ]
             
-        except requests.RequestException as e:
-            logger.warning(f"Ошибка запроса статуса (попытка {iteration+1}): {e}")
-            time.sleep(check_interval)
-            continue
+            if due:
+                await asyncio.gather(*(self._check(video_id, semaphore) for video_id in due))
+            await asyncio.sleep(self.tick)
+    
+    async def _check(self, video_id: str, semaphore: asyncio.Semaphore):
+        with self._lock:
+            job = self._jobs.get(video_id)
+        if job is None:
+            return
+        
+        retry_in = None
+        try:
+            async with semaphore:
+                self.status_requests += 1
+                result = await asyncio.to_thread(check_video_status, video_id)
+        except Exception as e:
+            # Сеть, битый JSON, ProviderUnavailable от лимитера - неудачная проверка, повторим позже
+            logger.warning(f"Ошибка запроса статуса {video_id}: {e}")
+            result = None
+            retry_in = getattr(e, "retry_in", None)
+        
+        if result and self._handle_result(video_id, result):
+            return
+        
+        if time.time() >= job["deadline"]:
+            timeout = int(job["deadline"] - job["started"])
+            logger.error(f"❌ Timeout: видео не было готово за {timeout} секунд")
+            self._finish(video_id, error=TimeoutError(f"Video {video_id} was not ready in {timeout} seconds"))
+            return
+        
+        # Открытый circuit / очередь лимитера сами говорят, когда пробовать снова
+        job["next_check"] = time.time() + (retry_in if retry_in else self._backoff(job))
+        job["attempt"] += 1
+    
+    def _handle_result(self, video_id: str, result: dict) -> bool:
+        """Обработать статус. True, если видео завершено (успешно или с ошибкой)."""
+        with self._lock:
+            job = self._jobs.get(video_id)
+        if job is None:
+            return True
+        
+        status = result["status"]
+        elapsed = int(time.time() - job["started"])
+        logger.info(f"Статус видео {video_id} [{elapsed}s]: {status}")
+        
+        # Вызываем callback для UI
+        if job["progress_callback"]:
+            try:
+                job["progress_callback"](status, elapsed)
+            except Exception as e:
+                logger.warning(f"progress_callback упал: {e}")
+        
+        if status == "completed":
+            if result["video_url"]:
+                logger.info(f"✅ Видео готово: {result['video_url']}")
+                self.history.record(job["script_length"], time.time() - job["started"])
+                self._finish(video_id, result=result["video_url"])
+            else:
+                logger.error(f"❌ Видео завершено, но URL не найден: {result}")
+                self._finish(video_id, error=ValueError("Video completed but no URL provided"))
+            return True
+        
+        if status == "failed":
+            error_msg = result["error"] or "Unknown error"
+            logger.error(f"❌ HeyGen сообщил об ошибке: {error_msg}")
+            self._finish(video_id, error=HeygenRenderError(f"HeyGen failed: {error_msg}"))
+            return True
+        
+        return False
     
-    # Timeout
-    logger.error(f"❌ Timeout: видео не было готово за {timeout} секунд")
-    raise TimeoutError(f"Video {video_id} was not ready in {timeout} seconds")
+    def _finish(self, video_id: str, result=None, error=None):
+        with self._lock:
+            job = self._jobs.pop(video_id, None)
+        if job is None or job["future"].done():
+            return
+        if error is not None:
+            job["future"].set_exception(error)
+        else:
+            job["future"].set_result(result)
+
+
+# Общий поллер процесса
+poller = HeygenPoller()
+
+
+def wait_video(video_id: str, timeout=900, progress_callback=None, script_length: int = 0) -> str:
+    """Ждёт готовности видео и возвращает прямой URL (блокирующая обёртка над poller)."""
+    future = poller.watch(
+        video_id, timeout=timeout, progress_callback=progress_callback, script_length=script_length
+    )
+    try:
+        return future.result(timeout=timeout + WAIT_MARGIN)
+    except concurrent.futures.TimeoutError:
+        raise TimeoutError(f"Video {video_id} was not ready in {timeout} seconds")
+
+
+def render_video_async(script: str, on_ready=None, progress_callback=None, timeout=900) -> concurrent.futures.Future:
+    """
+    Отправляет сценарий в HeyGen и сразу возвращает Future с URL видео.
+    
+    on_ready(future) вызывается из потока поллера, когда рендер завершён.
+    """
+    video_id = submit_to_heygen(script)
+    return poller.watch(
+        video_id, timeout=timeout, progress_callback=progress_callback,
+        on_done=on_ready, script_length=len(script.split())
+    )
 
 def render_video(script: str, progress_callback=None) -> str:
     """
@@ -327,8 +637,8 @@ def render_video(script: str, progress_callback=None) -> str:
         
         # Пробуем HeyGen
         try:
-        video_id = submit_to_heygen(script)
-            video_url = wait_video(video_id, progress_callback=progress_callback)
+            video_id = submit_to_heygen(script)
+            video_url = wait_video(video_id, progress_callback=progress_callback, script_length=len(script.split()))
             logger.info(f"✅ HeyGen видео создано: {video_url}")
             return video_url
         except RuntimeError as heygen_error:
@@ -343,7 +653,7 @@ def render_video(script: str, progress_callback=None) -> str:
                     from opensource_video import render_video_opensource
                     video_url = render_video_opensource(script, progress_callback)
                     logger.info(f"✅ Open-source видео создано: {video_url}")
-        return video_url
+                    return video_url
                 except ImportError:
                     logger.error("❌ Модуль opensource_video не найден")
                     logger.info("💡 Установите зависимости: pip install moviepy gtts pillow")
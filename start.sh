@@ -62,9 +62,15 @@ alembic upgrade head || {
 echo "✅ Migrations complete"
 echo ""
 
-# Start Celery worker with Beat in background
-echo "🔄 Starting Celery worker with Beat scheduler..."
-celery -A app.tasks.celery_app worker --beat --loglevel=info --concurrency=2 &
+# Fresh Prometheus multiprocess directory shared by the API and all workers
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/allaboutme_prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Start Celery workers in background: CPU-bound render pool + threaded I/O pool + beat
+echo "🔄 Starting Celery workers (render / io) and Beat scheduler..."
+./run_worker.sh render &
+./run_worker.sh io &
+./run_worker.sh beat &
 
 # Start FastAPI with uvicorn
 echo "🌐 Starting FastAPI server..."